@@ -1,5 +1,11 @@
 import tkinter as tk
 import math
+from bisect import bisect_left, insort
+
+import numpy as np
+
+from knowledge_tree import instrumentation
+from knowledge_tree.scheduler import FrameScheduler
 
 
 class Axes(object):
@@ -16,6 +22,20 @@ class Axes(object):
         pixels_per_unit     (dict): Stores the size conversion factor from units on the graph
             to Canvas pixels, for the x and y directions
         plotted_points      (list): Each element is an AxesPoint object
+        point_index         (dict): Stores a _PointIndex over the x and over the y
+            coordinates of the plotted points
+        pending_updates     (dict): Points changed by update_points whose canvas items
+            have not been updated yet, keyed by canvas reference
+        pending_series      (dict): AxesSeries whose polylines have not been updated
+            yet, keyed by id
+        plotted_series      (list): Each element is an AxesSeries object
+        home_scale          (dict): The scale the Axes was created with, restored by
+            reset_viewport
+        tick_items          (dict): The canvas items of the ticks and tick labels of
+            each axis, reused as the viewport changes
+        spatial_index       (_SpatialGrid): The canvas positions of the points shown on
+            the canvas, for hit-testing the mouse
+        tooltip             (dict): The canvas items and format of the hover tooltip
     
     Public methods:
         add_point(x, y, radius=3)
@@ -23,22 +43,57 @@ class Axes(object):
         show_point(point)
         get_point_by_x(x)
         get_point_by_y(y)
+        get_nearest_point_by_x(x, visible_only=False)
+        get_nearest_point_by_y(y, visible_only=False)
         move_point(point, new_x, new_y)
+        update_points(updates)
+        plot_series(xs, ys, mode='auto', radius=3, marker_spacing=None)
+        update_series(series, xs, ys)
+        flush()
+        set_viewport(x_min, x_max, y_min, y_max)
+        reset_viewport()
+        zoom(factor, canvas_x, canvas_y)
+        pan(dx, dy)
+        enable_zoom_and_pan()
+        enable_hover_tooltips(text_format='({0:g}, {1:g})', throttle_ms=16)
+        get_point_at(canvas_x, canvas_y, max_distance=HOVER_RADIUS)
         move_point_in_x_direction(y=0, new_x=0)
         move_point_in_y_direction(x=0, new_y=0)
         
     Private methods:
         _get_canvas_coords(x, y)
+        _get_data_coords(canvas_x, canvas_y)
+        _in_viewport(x, y)
+        _get_bounding_box(x, y, radius)
+        _sync_canvas_item(point)
+        _schedule_flush()
+        _series_visibility(xs, ys)
+        _update_series_markers(series, marker_indexes, visible)
+        _polyline_runs(xs, ys, visible)
+        _sync_series_lines(series)
         _draw_on_canvas()
         _draw_x_axis()
         _draw_y_axis()
-        _draw_x_ticks()
-        _draw_y_ticks()
-        _label_x_ticks()
-        _label_y_ticks()
+        _update_ticks()
+        _update_tick_items(axis, ticks, anchor)
+        _on_mouse_wheel(event)
+        _on_drag_start(event)
+        _on_drag(event)
+        _in_plot_area(canvas_x, canvas_y)
+        _on_motion(event)
+        _show_tooltip(canvas_x, canvas_y)
+        _hide_tooltip()
         _x_tick_locations()
         _y_tick_locations()
     """
+    # Average number of visible points per pixel column above which an 'auto'
+    # series is drawn as a polyline instead of as individual markers
+    LINE_MODE_DENSITY = 1.0
+    # Change of scale per notch of the mouse wheel
+    ZOOM_FACTOR = 1.2
+    # Pixels from the mouse within which a point shows its tooltip
+    HOVER_RADIUS = 10
+
     def __init__(self, canvas=None, corner_x=0, corner_y=0, display_width=0, display_height=0,
                  x_min=0, x_max=1000, x_step=100, y_min=0, y_max=1000, y_step=100,
                  x_label='x', y_label='y', x_ticks=True, y_ticks=True):
@@ -70,6 +125,20 @@ class Axes(object):
             'x': self.display_dimensions['width'] / (self.scale['x_max'] - self.scale['x_min']),
             'y': self.display_dimensions['height'] / (self.scale['y_max'] - self.scale['y_min'])}
         self.plotted_points = []
+        self.point_index = {
+            'x': _PointIndex(),
+            'y': _PointIndex()}
+        self.pending_updates = {}
+        self.pending_series = {}
+        self._flush_scheduled = False
+        self.plotted_series = []
+        self.home_scale = dict(self.scale)
+        self.tick_items = {
+            'x': [],
+            'y': []}
+        self._drag_start = None
+        self.spatial_index = _SpatialGrid(cell_size=2 * self.HOVER_RADIUS)
+        self.tooltip = None
         
         self._draw_on_canvas()
         
@@ -83,15 +152,14 @@ class Axes(object):
         Returns:
             A reference to the point that was added
         """
-        canvas_x, canvas_y = self._get_canvas_coords(x, y)
-        bounding_box = (
-            canvas_x - radius,
-            canvas_y - radius,
-            canvas_x + radius,
-            canvas_y + radius)
+        bounding_box = self._get_bounding_box(x, y, radius)
         reference = self.canvas.create_oval(*bounding_box, fill='red', outline='black')
         point = AxesPoint(x, y, reference, radius=radius)
+        point.canvas_bounding_box = bounding_box
+        self.spatial_index.update(point, bounding_box)
         self.plotted_points.append(point)
+        self.point_index['x'].add(x, point)
+        self.point_index['y'].add(y, point)
         return point
 
     def hide_point(self, point):
@@ -101,8 +169,7 @@ class Axes(object):
             point: A reference to the point in the plotted_points list to be hidden
         """
         point.visible = False
-        self.move_point(point, point.x, 0)
-        self.canvas.itemconfigure(point.reference, state=tk.HIDDEN)
+        self._sync_canvas_item(point)
 
     def show_point(self, point):
         """Shows a point that has been hidden
@@ -111,7 +178,7 @@ class Axes(object):
             point: A reference to the point to be shown
         """
         point.visible = True
-        self.canvas.itemconfigure(point.reference, state=tk.NORMAL)
+        self._sync_canvas_item(point)
     
     def get_point_by_x(self, x):
         """Returns an AxesPoint object representing a point plotted on the Axes at a
@@ -120,22 +187,34 @@ class Axes(object):
         Args:
             x (numeric): The x-coordinate of the desired point
         """
-        for point in self.plotted_points:
-            if point.x == x:
-                return point
-        raise ValueError('No point exists with that value on the graph')
+        return self.point_index['x'].get(x)
         
     def get_point_by_y(self, y):
         """Returns an AxesPoint object representing a point plotted on the Axes at a
         certain y value.
         
         Args:
-            y (numeric): The x-coordinate of the desired point
+            y (numeric): The y-coordinate of the desired point
         """
-        for point in self.plotted_points:
-            if point.y == y:
-                return point
-        raise ValueError('No point exists with that value on the graph')
+        return self.point_index['y'].get(y)
+
+    def get_nearest_point_by_x(self, x, visible_only=False):
+        """Returns the AxesPoint plotted on the Axes whose x value is closest to x.
+
+        Args:
+            x (numeric)
+            visible_only (bool): Ignore hidden points
+        """
+        return self.point_index['x'].nearest(x, visible_only)
+
+    def get_nearest_point_by_y(self, y, visible_only=False):
+        """Returns the AxesPoint plotted on the Axes whose y value is closest to y.
+
+        Args:
+            y (numeric)
+            visible_only (bool): Ignore hidden points
+        """
+        return self.point_index['y'].nearest(y, visible_only)
         
     def move_point(self, point, new_x, new_y):
         """Moves a point to a new position on the axes.
@@ -148,16 +227,234 @@ class Axes(object):
             new_x (numeric): The new x coordinate
             new_y (numeric): The new y coordinate
         """
-        
+        if new_x != point.x:
+            self.point_index['x'].move(point.x, new_x, point)
+        if new_y != point.y:
+            self.point_index['y'].move(point.y, new_y, point)
         point.x, point.y = new_x, new_y
-        canvas_x, canvas_y = self._get_canvas_coords(new_x, new_y)
-        bounding_box = (
-            canvas_x - point.radius,
-            canvas_y - point.radius,
-            canvas_x + point.radius,
-            canvas_y + point.radius)
-        self.canvas.coords(point.reference, *bounding_box)
+        self._sync_canvas_item(point)
+
+    def update_points(self, updates):
+        """Moves, shows, and hides many points at once, deferring the canvas work.
+
+        The points are updated straight away, but their canvas items are only
+        updated when the pending updates are flushed, at most once per frame
+        from the Tk idle loop. Only items whose pixel coordinates or visibility
+        actually changed cost a call to Tk.
+
+        Args:
+            updates (iterable): (point, new_x, new_y, visible) tuples
+        """
+        for point, new_x, new_y, visible in updates:
+            if new_x != point.x:
+                self.point_index['x'].move(point.x, new_x, point)
+            if new_y != point.y:
+                self.point_index['y'].move(point.y, new_y, point)
+            point.x, point.y, point.visible = new_x, new_y, visible
+            self.pending_updates[point.reference] = point
+
+        if self.pending_updates:
+            self._schedule_flush()
+
+    def plot_series(self, xs, ys, mode='auto', radius=3, marker_spacing=None):
+        """Plots a whole series of points, drawn as individual markers or as a polyline.
+
+        Args:
+            xs (array-like): The x coordinates of the points
+            ys (array-like): The y coordinates of the points. Points whose y is
+                not finite, or which fall outside of the scale, are not drawn.
+            mode (str): 'markers' draws one oval per point, 'line' draws the
+                series as a polyline, and 'auto' chooses a polyline when there is
+                more than LINE_MODE_DENSITY visible point per pixel column
+            radius (numeric): The radius of the markers
+            marker_spacing (int): In line mode, also draw a marker at most every
+                marker_spacing pixels. None draws no markers.
+        Returns:
+            A reference to the AxesSeries that was plotted
+        """
+        series = AxesSeries(mode=mode, radius=radius, marker_spacing=marker_spacing)
+        self.plotted_series.append(series)
+        self.update_series(series, xs, ys)
+        return series
+
+    def update_series(self, series, xs, ys):
+        """Replaces the points of a series, switching between markers and a
+        polyline as the density of the points requires.
+
+        Canvas updates are batched and diffed the same way as update_points.
+        """
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        visible = self._series_visibility(xs, ys)
+
+        rendered_as = series.mode
+        if rendered_as == 'auto':
+            columns = self._get_canvas_x_array(xs[visible])
+            dense = len(columns) > self.LINE_MODE_DENSITY * len(np.unique(columns))
+            rendered_as = 'line' if dense else 'markers'
+        series.xs, series.ys, series.rendered_as = xs, ys, rendered_as
+
+        if rendered_as == 'markers':
+            series.line_coords = []
+            marker_indexes = np.arange(len(xs))
+        else:
+            series.line_coords = self._polyline_runs(xs, ys, visible)
+            marker_indexes = np.array([], dtype=np.intp)
+            if series.marker_spacing:
+                visible_indexes = np.flatnonzero(visible)
+                marker_columns = self._get_canvas_x_array(xs[visible_indexes]) // series.marker_spacing
+                marker_indexes = visible_indexes[np.unique(marker_columns, return_index=True)[1]]
+
+        self._update_series_markers(series, marker_indexes, visible)
+        self.pending_series[id(series)] = series
+        self._schedule_flush()
+
+    def flush(self):
+        """Applies the pending updates from update_points and update_series to the canvas"""
+        self._flush_scheduled = False
+        touched = 0
+        with instrumentation.timer('axes.flush_seconds'):
+            pending, self.pending_updates = self.pending_updates, {}
+            for point in pending.values():
+                touched += self._sync_canvas_item(point)
+            pending_series, self.pending_series = self.pending_series, {}
+            for series in pending_series.values():
+                touched += self._sync_series_lines(series)
+        instrumentation.observe('axes.items_per_frame', touched)
         
+    def set_viewport(self, x_min, x_max, y_min, y_max):
+        """Changes the ranges of x and y shown on the Axes.
+
+        The ticks are regenerated at a spacing suited to the new ranges, reusing
+        their canvas items, and every point and series is redrawn, with whatever
+        falls outside of the viewport culled.
+        """
+        if not (x_min < x_max and y_min < y_max):
+            raise ValueError("Empty viewport")
+        for axis, low, high in (('x', x_min, x_max), ('y', y_min, y_max)):
+            home_ticks = ((self.home_scale[axis + '_max'] - self.home_scale[axis + '_min']) /
+                          self.home_scale[axis + '_step'])
+            self.scale[axis + '_min'] = low
+            self.scale[axis + '_max'] = high
+            self.scale[axis + '_step'] = _nice_step((high - low) / home_ticks)
+        self.pixels_per_unit['x'] = self.display_dimensions['width'] / (x_max - x_min)
+        self.pixels_per_unit['y'] = self.display_dimensions['height'] / (y_max - y_min)
+
+        self._update_ticks()
+        for point in self.plotted_points:
+            self.pending_updates[point.reference] = point
+        for series in self.plotted_series:
+            self.update_series(series, series.xs, series.ys)
+        self._schedule_flush()
+
+    def reset_viewport(self):
+        """Returns to the viewport the Axes was created with"""
+        self.set_viewport(self.home_scale['x_min'], self.home_scale['x_max'],
+                          self.home_scale['y_min'], self.home_scale['y_max'])
+
+    def zoom(self, factor, canvas_x, canvas_y):
+        """Zooms in by factor (or out, for a factor below 1), keeping the point
+        under the given canvas coordinates in place"""
+        x, y = self._get_data_coords(canvas_x, canvas_y)
+        self.set_viewport(
+            x - (x - self.scale['x_min']) / factor, x + (self.scale['x_max'] - x) / factor,
+            y - (y - self.scale['y_min']) / factor, y + (self.scale['y_max'] - y) / factor)
+
+    def pan(self, dx, dy):
+        """Moves the contents of the Axes by dx, dy canvas pixels"""
+        shift_x = dx / self.pixels_per_unit['x']
+        shift_y = dy / self.pixels_per_unit['y']
+        self.set_viewport(
+            self.scale['x_min'] - shift_x, self.scale['x_max'] - shift_x,
+            self.scale['y_min'] + shift_y, self.scale['y_max'] + shift_y)
+
+    def enable_zoom_and_pan(self):
+        """Binds the mouse wheel to zoom and dragging with the left button to pan"""
+        self.canvas.bind('<MouseWheel>', self._on_mouse_wheel)
+        self.canvas.bind('<Button-4>', self._on_mouse_wheel)
+        self.canvas.bind('<Button-5>', self._on_mouse_wheel)
+        self.canvas.bind('<ButtonPress-1>', self._on_drag_start)
+        self.canvas.bind('<B1-Motion>', self._on_drag)
+        self.canvas.bind('<Double-Button-1>', lambda event: self.reset_viewport())
+
+    def _on_mouse_wheel(self, event):
+        """Zooms in or out around the mouse when the wheel is turned over the plot"""
+        if not self._in_plot_area(event.x, event.y):
+            return
+        zoom_in = event.num == 4 or getattr(event, 'delta', 0) > 0
+        self.zoom(self.ZOOM_FACTOR if zoom_in else 1 / self.ZOOM_FACTOR, event.x, event.y)
+
+    def _on_drag_start(self, event):
+        self._drag_start = (event.x, event.y) if self._in_plot_area(event.x, event.y) else None
+
+    def _on_drag(self, event):
+        """Pans by the distance the mouse moved since the last motion event"""
+        if self._drag_start is None:
+            return
+        start_x, start_y = self._drag_start
+        self._drag_start = (event.x, event.y)
+        self.pan(event.x - start_x, event.y - start_y)
+
+    def _on_motion(self, event):
+        self.tooltip['scheduler'].request(event.x, event.y)
+
+    def _show_tooltip(self, canvas_x, canvas_y):
+        """Moves the tooltip to the point nearest to the mouse, or hides it if
+        there is none close enough"""
+        point = self.get_point_at(canvas_x, canvas_y)
+        if point is None:
+            self._hide_tooltip()
+            return
+        shown = (point, point.canvas_bounding_box, point.x, point.y)
+        if shown == self.tooltip['point']:
+            return
+
+        self.tooltip['point'] = shown
+        x0, y0, x1, y1 = point.canvas_bounding_box
+        text = self.tooltip['format'].format(point.x, point.y)
+        self.canvas.coords(self.tooltip['text'], x1 + 4, y0 - 4)
+        self.canvas.itemconfigure(self.tooltip['text'], text=text, state=tk.NORMAL)
+        left, top, right, bottom = self.canvas.bbox(self.tooltip['text'])
+        self.canvas.coords(self.tooltip['background'], left - 2, top - 1, right + 2, bottom + 1)
+        self.canvas.itemconfigure(self.tooltip['background'], state=tk.NORMAL)
+        self.canvas.tag_raise(self.tooltip['background'])
+        self.canvas.tag_raise(self.tooltip['text'])
+
+    def _hide_tooltip(self):
+        if self.tooltip['point'] is not None:
+            self.tooltip['point'] = None
+            self.canvas.itemconfigure(self.tooltip['text'], state=tk.HIDDEN)
+            self.canvas.itemconfigure(self.tooltip['background'], state=tk.HIDDEN)
+
+    def _in_plot_area(self, canvas_x, canvas_y):
+        return (0 <= canvas_x - self.corner['x'] <= self.display_dimensions['width'] and
+                0 <= self.corner['y'] - canvas_y <= self.display_dimensions['height'])
+
+    def get_point_at(self, canvas_x, canvas_y, max_distance=HOVER_RADIUS):
+        """Returns the point shown on the canvas nearest to the given canvas
+        coordinates, or None if there is none within max_distance pixels"""
+        return self.spatial_index.nearest(canvas_x, canvas_y, max_distance)
+
+    def enable_hover_tooltips(self, text_format='({0:g}, {1:g})', throttle_ms=16):
+        """Shows the coordinates of the point nearest to the mouse in a tooltip.
+
+        Motion events are coalesced so that at most one hit-test runs every
+        throttle_ms. A single tooltip is reused for every point.
+
+        Args:
+            text_format (str): Formatted with the x and y of the point
+            throttle_ms (int): The minimum time between hit-tests
+        """
+        self.tooltip = {
+            'format': text_format,
+            'background': self.canvas.create_rectangle(
+                0, 0, 0, 0, fill='#FFFFE0', outline='black', state=tk.HIDDEN),
+            'text': self.canvas.create_text(0, 0, anchor=tk.SW, state=tk.HIDDEN),
+            'point': None,
+            'scheduler': FrameScheduler(self.canvas, self._show_tooltip, frame_budget_ms=throttle_ms)}
+        self.canvas.bind('<Motion>', self._on_motion)
+        self.canvas.bind('<Leave>', lambda event: self._hide_tooltip())
+
     def move_point_in_x_direction(self, y=0, new_x=0):
         """Moves a point to a new x coordinate.
         
@@ -181,21 +478,144 @@ class Axes(object):
     def _get_canvas_coords(self, x, y):
         """Transforms the coordinates of the given point to reflect the coordinates on the Canvas
         at which that point must be plotted."""
-        canvas_x = self.corner['x'] + math.floor(x * self.pixels_per_unit['x'])
-        canvas_y = self.corner['y'] - math.floor(y * self.pixels_per_unit['y'])
+        canvas_x = self.corner['x'] + math.floor((x - self.scale['x_min']) * self.pixels_per_unit['x'])
+        canvas_y = self.corner['y'] - math.floor((y - self.scale['y_min']) * self.pixels_per_unit['y'])
         return canvas_x, canvas_y
+
+    def _get_data_coords(self, canvas_x, canvas_y):
+        """Transforms canvas coordinates back to coordinates on the Axes"""
+        x = self.scale['x_min'] + (canvas_x - self.corner['x']) / self.pixels_per_unit['x']
+        y = self.scale['y_min'] + (self.corner['y'] - canvas_y) / self.pixels_per_unit['y']
+        return x, y
+
+    def _in_viewport(self, x, y):
+        return (self.scale['x_min'] <= x <= self.scale['x_max'] and
+                self.scale['y_min'] <= y <= self.scale['y_max'])
+
+    def _get_bounding_box(self, x, y, radius):
+        """Returns the canvas bounding box of a point of the given radius"""
+        canvas_x, canvas_y = self._get_canvas_coords(x, y)
+        return (
+            canvas_x - radius,
+            canvas_y - radius,
+            canvas_x + radius,
+            canvas_y + radius)
+
+    def _get_canvas_x_array(self, xs):
+        """Vectorized _get_canvas_coords for an array of x values"""
+        return self.corner['x'] + np.floor((xs - self.scale['x_min']) * self.pixels_per_unit['x']).astype(np.intp)
+
+    def _get_canvas_y_array(self, ys):
+        """Vectorized _get_canvas_coords for an array of y values"""
+        return self.corner['y'] - np.floor((ys - self.scale['y_min']) * self.pixels_per_unit['y']).astype(np.intp)
+
+    def _schedule_flush(self):
+        """Arranges for flush to run once the Tk event loop is idle"""
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.canvas.after_idle(self.flush)
+
+    def _series_visibility(self, xs, ys):
+        """Returns a boolean array of which points of a series fall within the scale"""
+        with np.errstate(invalid='ignore'):
+            return (np.isfinite(xs) & np.isfinite(ys) &
+                    (xs >= self.scale['x_min']) & (xs <= self.scale['x_max']) &
+                    (ys >= self.scale['y_min']) & (ys <= self.scale['y_max']))
+
+    def _update_series_markers(self, series, marker_indexes, visible):
+        """Moves the marker points of a series onto the points at marker_indexes,
+        adding markers as needed and hiding the ones left over"""
+        while len(series.points) < len(marker_indexes):
+            point = self.add_point(self.scale['x_min'], self.scale['y_min'], radius=series.radius)
+            self.hide_point(point)
+            series.points.append(point)
+
+        updates = []
+        for point, k in zip(series.points, marker_indexes.tolist()):
+            if visible[k]:
+                updates.append((point, float(series.xs[k]), float(series.ys[k]), True))
+            else:
+                updates.append((point, point.x, point.y, False))
+        for point in series.points[len(marker_indexes):]:
+            updates.append((point, point.x, point.y, False))
+        self.update_points(updates)
+
+    def _polyline_runs(self, xs, ys, visible):
+        """Returns the flat canvas coordinate list of a polyline for each run of
+        consecutive visible points.
+
+        Points that share a pixel column are reduced to the first, last, lowest,
+        and highest of them, which draws the same pixels with far fewer vertices.
+        """
+        runs = []
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], visible.astype(np.int8), [0]))))
+        for start, stop in zip(edges[::2].tolist(), edges[1::2].tolist()):
+            canvas_x = self._get_canvas_x_array(xs[start:stop])
+            canvas_y = self._get_canvas_y_array(ys[start:stop])
+            keep = _column_extremes(canvas_x, canvas_y)
+            if len(keep) >= 2:
+                runs.append(np.column_stack((canvas_x[keep], canvas_y[keep])).ravel().tolist())
+        return runs
+
+    def _sync_series_lines(self, series):
+        """Brings the polyline items of a series up to date with its line_coords,
+        reusing existing items and hiding the ones left over.
+
+        Returns:
+            The number of canvas items created or changed
+        """
+        touched = 0
+        for n, coords in enumerate(series.line_coords):
+            if n == len(series.lines):
+                series.lines.append([self.canvas.create_line(*coords, fill='red'), coords, True])
+                touched += 1
+                continue
+            line = series.lines[n]
+            changed = not line[2] or coords != line[1]
+            if coords != line[1]:
+                self.canvas.coords(line[0], *coords)
+                line[1] = coords
+            if not line[2]:
+                self.canvas.itemconfigure(line[0], state=tk.NORMAL)
+                line[2] = True
+            touched += changed
+        for line in series.lines[len(series.line_coords):]:
+            if line[2]:
+                self.canvas.itemconfigure(line[0], state=tk.HIDDEN)
+                line[2] = False
+                touched += 1
+        return touched
+
+    def _sync_canvas_item(self, point):
+        """Brings the canvas item of a point up to date, only calling Tk for what changed.
+
+        Points outside of the viewport are culled like hidden points. Neither is
+        moved; they are moved when they are next shown.
+
+        Returns:
+            True if the canvas item was changed
+        """
+        shown = point.visible and self._in_viewport(point.x, point.y)
+        changed = shown != point.canvas_visible
+        if shown:
+            bounding_box = self._get_bounding_box(point.x, point.y, point.radius)
+            if bounding_box != point.canvas_bounding_box:
+                self.canvas.coords(point.reference, *bounding_box)
+                point.canvas_bounding_box = bounding_box
+                changed = True
+        if shown != point.canvas_visible:
+            self.canvas.itemconfigure(point.reference, state=tk.NORMAL if shown else tk.HIDDEN)
+            point.canvas_visible = shown
+        if changed:
+            self.spatial_index.update(point, point.canvas_bounding_box if shown else None)
+        return changed
         
     def _draw_on_canvas(self):
         """Draws the axes on the canvas"""
         self._draw_x_axis()
         self._draw_y_axis()
-        if self.options['x_ticks']:
-            self._draw_x_ticks()
-            self._label_x_ticks()
-        if self.options['y_ticks']:
-            self._draw_y_ticks() 
-            self._label_y_ticks()
-                
+        self._update_ticks()
+
     def _draw_x_axis(self):
         """Draws the x axis on the canvas"""
         self.canvas.create_line(
@@ -215,35 +635,56 @@ class Axes(object):
         self.canvas.create_text(
             self.corner['x'] - 10, self.corner['y'] - self.display_dimensions['height'],
             text=self.axes_labels['y'])
-            
-    def _draw_x_ticks(self):
-        """Draws the x ticks on the canvas"""
-        for x, canvas_x in self._x_tick_locations():
-            self.canvas.create_line(
-                canvas_x, self.corner['y'] - self.display_dimensions['half_tick_length'],
-                canvas_x, self.corner['y'] + self.display_dimensions['half_tick_length'])
-                
-    def _draw_y_ticks(self):
-        """Draws the y ticks on the canvas"""
-        for y, canvas_y in self._y_tick_locations():
-            self.canvas.create_line(
-                self.corner['x'] - self.display_dimensions['half_tick_length'], canvas_y,
-                self.corner['x'] + self.display_dimensions['half_tick_length'], canvas_y)
-
-    def _label_x_ticks(self):
-        """Labels the x ticks on the canvas"""
-        for x, canvas_x in self._x_tick_locations():
-            self.canvas.create_text(
-                canvas_x, self.corner['y'] + self.display_dimensions['tick_label_offset'],
-                text=str(x), anchor=tk.N)
-        
-    def _label_y_ticks(self):
-        """Labels the y ticks on the canvas"""
-        for y, canvas_y in self._y_tick_locations():
-            self.canvas.create_text(
-                self.corner['x'] - self.display_dimensions['tick_label_offset'], canvas_y,
-                text=str(y), anchor=tk.E)
-            
+
+    def _update_ticks(self):
+        """Draws and labels the ticks for the current viewport, reusing the canvas
+        items of earlier ticks and hiding the ones left over"""
+        half = self.display_dimensions['half_tick_length']
+        offset = self.display_dimensions['tick_label_offset']
+        if self.options['x_ticks']:
+            self._update_tick_items('x', [
+                ((canvas_x, self.corner['y'] - half, canvas_x, self.corner['y'] + half),
+                 (canvas_x, self.corner['y'] + offset), _format_tick(x))
+                for x, canvas_x in self._x_tick_locations()], anchor=tk.N)
+        if self.options['y_ticks']:
+            self._update_tick_items('y', [
+                ((self.corner['x'] - half, canvas_y, self.corner['x'] + half, canvas_y),
+                 (self.corner['x'] - offset, canvas_y), _format_tick(y))
+                for y, canvas_y in self._y_tick_locations()], anchor=tk.E)
+
+    def _update_tick_items(self, axis, ticks, anchor):
+        """Moves the tick and label items of an axis to the given ticks.
+
+        Args:
+            axis (str): 'x' or 'y'
+            ticks (list): (line coords, label coords, label text) for each tick
+            anchor: The anchor of the labels
+        """
+        items = self.tick_items[axis]
+        for n, tick in enumerate(ticks):
+            line_coords, label_coords, text = tick
+            if n == len(items):
+                items.append([
+                    self.canvas.create_line(*line_coords),
+                    self.canvas.create_text(*label_coords, text=text, anchor=anchor),
+                    tick, True])
+                continue
+            line, label, drawn, visible = items[n]
+            if line_coords != drawn[0]:
+                self.canvas.coords(line, *line_coords)
+                self.canvas.coords(label, *label_coords)
+            if text != drawn[2]:
+                self.canvas.itemconfigure(label, text=text)
+            if not visible:
+                self.canvas.itemconfigure(line, state=tk.NORMAL)
+                self.canvas.itemconfigure(label, state=tk.NORMAL)
+            items[n][2:] = [tick, True]
+        for item in items[len(ticks):]:
+            if item[3]:
+                self.canvas.itemconfigure(item[0], state=tk.HIDDEN)
+                self.canvas.itemconfigure(item[1], state=tk.HIDDEN)
+                item[3] = False
+
     def _x_tick_locations(self):
         """Generator function returning an iterator to the locations of the x ticks.
         
@@ -251,11 +692,9 @@ class Axes(object):
             the abstract coordinate x along with the corresponding canvas coordinate
             canvas_x
         """
-        x = self.scale['x_step']
-        while x < self.scale['x_max']:
-            canvas_x, canvas_y = self._get_canvas_coords(x, 0)
+        for x in _tick_values(self.scale['x_min'], self.scale['x_max'], self.scale['x_step']):
+            canvas_x, canvas_y = self._get_canvas_coords(x, self.scale['y_min'])
             yield x, canvas_x
-            x += self.scale['x_step']
         
     def _y_tick_locations(self):
         """Generator function returning an iterator to the locations of the y ticks.
@@ -264,13 +703,166 @@ class Axes(object):
             the abstract coordinate y along with the corresponding canvas coordinate
             canvas_y
         """
-        y = self.scale['y_step']
-        while y < self.scale['y_max']:
-            canvas_x, canvas_y = self._get_canvas_coords(0, y)
+        for y in _tick_values(self.scale['y_min'], self.scale['y_max'], self.scale['y_step']):
+            canvas_x, canvas_y = self._get_canvas_coords(self.scale['x_min'], y)
             yield y, canvas_y
-            y += self.scale['y_step']
             
     
+def _tick_values(low, high, step):
+    """Returns the multiples of step strictly between low and high"""
+    first = math.floor(low / step) + 1
+    values = []
+    k = first
+    while k * step < high:
+        values.append(k * step)
+        k += 1
+    return values
+
+
+def _nice_step(raw_step):
+    """Rounds a tick spacing up to 1, 2, or 5 times a power of ten"""
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+    for multiple in (1, 2, 5, 10):
+        if raw_step <= multiple * magnitude * (1 + 1e-9):
+            return multiple * magnitude
+    return 10 * magnitude
+
+
+def _format_tick(value):
+    """Formats a tick value without float noise"""
+    return '{:.10g}'.format(round(value, 10))
+
+
+def _column_extremes(canvas_x, canvas_y):
+    """Returns the sorted indexes of the first, last, lowest, and highest point in
+    each pixel column"""
+    columns = np.unique(canvas_x, return_inverse=True)[1]
+    first = np.unique(columns, return_index=True)[1]
+    last = len(columns) - 1 - np.unique(columns[::-1], return_index=True)[1]
+    by_height = np.lexsort((canvas_y, columns))
+    group_starts = np.flatnonzero(np.diff(np.concatenate(([-1], columns[by_height]))))
+    group_ends = np.concatenate((group_starts[1:], [len(columns)])) - 1
+    return np.unique(np.concatenate((first, last, by_height[group_starts], by_height[group_ends])))
+
+
+class _PointIndex(object):
+    """Indexes AxesPoints by one of their coordinates.
+
+    A hash map gives O(1) exact lookups and a sorted list of the distinct
+    coordinate values gives O(log n) nearest lookups.
+    """
+    def __init__(self):
+        self._points = {}
+        self._keys = []
+
+    def add(self, key, point):
+        points = self._points.setdefault(key, [])
+        if not points:
+            insort(self._keys, key)
+        points.append(point)
+
+    def remove(self, key, point):
+        points = self._points[key]
+        points.remove(point)
+        if not points:
+            del self._points[key]
+            del self._keys[bisect_left(self._keys, key)]
+
+    def move(self, old_key, new_key, point):
+        self.remove(old_key, point)
+        self.add(new_key, point)
+
+    def get(self, key):
+        points = self._points.get(key)
+        if not points:
+            raise ValueError('No point exists with that value on the graph')
+        return points[0]
+
+    def nearest(self, key, visible_only=False):
+        """Returns the point whose coordinate is closest to key, searching outwards
+        from its position in the sorted keys"""
+        right = bisect_left(self._keys, key)
+        left = right - 1
+        while left >= 0 or right < len(self._keys):
+            if right >= len(self._keys) or (
+                    left >= 0 and key - self._keys[left] <= self._keys[right] - key):
+                candidates, left = self._points[self._keys[left]], left - 1
+            else:
+                candidates, right = self._points[self._keys[right]], right + 1
+            for point in candidates:
+                if point.visible or not visible_only:
+                    return point
+        raise ValueError('No points are plotted on the graph')
+
+
+class _SpatialGrid(object):
+    """Indexes points by their position on the canvas in a uniform grid of square
+    cells, so the points near a position are found by checking a few cells."""
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self._cells = {}
+        self._locations = {}
+
+    def update(self, point, bounding_box):
+        """Moves a point to the center of bounding_box, or removes it for None"""
+        old = self._locations.pop(point, None)
+        if old is not None:
+            cell = self._cells[old[0]]
+            del cell[point]
+            if not cell:
+                del self._cells[old[0]]
+        if bounding_box is not None:
+            x = (bounding_box[0] + bounding_box[2]) / 2
+            y = (bounding_box[1] + bounding_box[3]) / 2
+            key = (int(x // self.cell_size), int(y // self.cell_size))
+            self._cells.setdefault(key, {})[point] = (x, y)
+            self._locations[point] = (key, x, y)
+
+    def nearest(self, x, y, max_distance):
+        """Returns the point nearest to (x, y) within max_distance, or None"""
+        reach = int(math.ceil(max_distance / self.cell_size))
+        cell_x, cell_y = int(x // self.cell_size), int(y // self.cell_size)
+        best, best_distance = None, max_distance ** 2
+        for i in range(cell_x - reach, cell_x + reach + 1):
+            for j in range(cell_y - reach, cell_y + reach + 1):
+                for point, (px, py) in self._cells.get((i, j), {}).items():
+                    distance = (px - x) ** 2 + (py - y) ** 2
+                    if distance <= best_distance:
+                        best, best_distance = point, distance
+        return best
+
+    def __len__(self):
+        return len(self._locations)
+
+
+class AxesSeries(object):
+    """Represents a series of points plotted on an Axes object
+
+    Attributes:
+        mode            (str): 'markers', 'line', or 'auto'
+        rendered_as     (str): 'markers' or 'line', whichever was last drawn
+        radius          (numeric): The radius of the markers
+        marker_spacing  (int): The minimum pixels between markers in line mode
+        xs, ys          (np.ndarray): The coordinates of the points
+        points          (list): The AxesPoint markers drawn for the series
+        line_coords     (list): The canvas coordinates of each polyline to draw
+        lines           (list): [reference, coords, visible] for each polyline item
+            on the canvas
+    """
+    def __init__(self, mode='auto', radius=3, marker_spacing=None):
+        if mode not in ('auto', 'markers', 'line'):
+            raise ValueError("Unknown series mode {}".format(mode))
+        self.mode = mode
+        self.rendered_as = None
+        self.radius = radius
+        self.marker_spacing = marker_spacing
+        self.xs = np.array([])
+        self.ys = np.array([])
+        self.points = []
+        self.line_coords = []
+        self.lines = []
+
+
 class AxesPoint(object):
     """Represents one of the points plotted on an Axes object"""
     def __init__(self, x, y, reference, radius=3):
@@ -279,3 +871,6 @@ class AxesPoint(object):
         self.reference = reference
         self.radius = radius
         self.visible = True
+        # The state last sent to the canvas, so unchanged items can be skipped
+        self.canvas_bounding_box = None
+        self.canvas_visible = True
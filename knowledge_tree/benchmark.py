@@ -0,0 +1,305 @@
+"""Benchmarks of the hot paths of Knowledge Tree.
+
+Every benchmark runs a fixed, seeded workload against scaled-down ranges, so
+results are comparable from run to run. Each workload is timed several times
+and the fastest time is kept. Results are written as JSON and compared with
+a stored baseline; a benchmark regresses when it is slower than its baseline
+by more than the threshold.
+
+Baselines hold absolute times, so they are only meaningful on the machine
+that recorded them. The committed baseline is from one development machine;
+on other hardware, record a local baseline with --save-baseline before
+comparing against it. A note is printed when the baseline was recorded on
+another architecture or Python version.
+
+Usage:
+    python -m knowledge_tree.benchmark [--output results.json] [--baseline BASELINE]
+        [--threshold 0.25] [--repeat 5] [--save-baseline] [NAME ...]
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import knowledge_tree.constants as constants
+import knowledge_tree.database as database
+from knowledge_tree.financial_tools import payments_to_payoff, payments_to_payoff_array
+from knowledge_tree.model import Model
+from knowledge_tree.offscreen import OffscreenCanvas
+from knowledge_tree.view import View
+
+
+# Beside the package, so the baseline is found whatever the working directory
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'baseline.json')
+DEFAULT_THRESHOLD = 0.25    # fraction slower than the baseline that counts as a regression
+DEFAULT_REPEAT = 5
+SEED = 2016
+# The ranges every benchmark runs against: 26 x 51 x 41 cells
+SCALED_RANGES = {
+    'initial_balance': {'default': 12000, 'min': 0, 'max': 25000, 'step': 1000},
+    'interest_rate': {'default': 0.05, 'min': 0, 'max': 0.1, 'step': 0.002},
+    'monthly_payment': {'min': 0, 'max': 4000, 'step': 100}}
+
+
+class Workload(object):
+    """One fixed piece of work to time
+
+    Attributes:
+        operations  (int): The number of operations run performs, for reporting throughput
+        run         (function): Performs the work
+        before      (function): Called before each timed run, untimed, or None
+    """
+    def __init__(self, operations, run, before=None):
+        self.operations = operations
+        self.run = run
+        self.before = before
+
+
+@contextlib.contextmanager
+def scaled_ranges():
+    """Swaps the ranges in constants for SCALED_RANGES for the duration of the block.
+    The curves View has cached are cleared on the way in and out, since they
+    were computed on the other ranges."""
+    saved = {}
+    for name, value_range in SCALED_RANGES.items():
+        saved[name] = dict(getattr(constants, name))
+        getattr(constants, name).clear()
+        getattr(constants, name).update(value_range)
+    View.curve_cache.clear()
+    try:
+        yield
+    finally:
+        for name, value_range in saved.items():
+            getattr(constants, name).clear()
+            getattr(constants, name).update(value_range)
+        View.curve_cache.clear()
+
+
+def _grid_points(count, rng):
+    """Returns count random (Bo, r, p) points on the grid that are paid off"""
+    axes = [constants.initial_balance_axis(), constants.interest_rate_axis(),
+            constants.monthly_payment_axis()]
+    points = []
+    while len(points) < count:
+        Bo, r, p = (axis[int(rng.integers(len(axis)))] for axis in axes)
+        if np.isfinite(payments_to_payoff_array(Bo, r / 12, p)):
+            points.append((Bo, r, p))
+    return points
+
+
+def payoff_scalar():
+    rng = np.random.default_rng(SEED)
+    inputs = list(zip(rng.uniform(0, 200000, 20000).tolist(),
+                      rng.uniform(0, 0.1 / 12, 20000).tolist(),
+                      rng.uniform(0, 4000, 20000).tolist()))
+
+    def run():
+        for a, i, p in inputs:
+            payments_to_payoff(a, i, p)
+    return Workload(len(inputs), run)
+
+
+def payoff_array():
+    rng = np.random.default_rng(SEED)
+    a = rng.uniform(0, 200000, 1000000)
+    i = rng.uniform(0, 0.1 / 12, 1000000)
+    p = rng.uniform(0, 4000, 1000000)
+    return Workload(a.size, lambda: payments_to_payoff_array(a, i, p))
+
+
+def calculate_payoff_times():
+    model = Model(db=database.db)
+
+    def before():
+        for _ in database.purge_points(truncate=True):
+            pass
+    operations = sum(1 for _ in Model.payoff_rows())
+    return Workload(operations, model.calculate_payoff_times, before)
+
+
+def _populate():
+    """Fills the database with the scaled-down grid, if it is not filled already"""
+    if not database.DataPoint.select().exists():
+        calculate_payoff_times().run()
+
+
+def database_point_reads():
+    _populate()
+    points = _grid_points(2000, np.random.default_rng(SEED))
+
+    def run():
+        for Bo, r, p in points:
+            database.get_payoff_time(Bo, r, p)
+    return Workload(len(points), run)
+
+
+def database_curve_reads():
+    _populate()
+    points = _grid_points(500, np.random.default_rng(SEED))
+
+    def run():
+        for Bo, r, _ in points:
+            database.get_time_vs_payment_data(Bo, r)
+    return Workload(len(points), run)
+
+
+def load_payoff_times():
+    _populate()
+    model = Model(db=database.db)
+    return Workload(database.DataPoint.select().count(), model.load_payoff_times)
+
+
+def view_update_axes():
+    # Drawn offscreen, so this times the View and Axes work of a redraw
+    # without a display
+    canvas = OffscreenCanvas()
+    view = View(canvas=canvas)
+    points = _grid_points(200, np.random.default_rng(SEED))
+
+    def run():
+        for Bo, r, _ in points:
+            view.update_axes(Bo, r)
+            canvas.update_idletasks()
+    return Workload(len(points), run, before=View.curve_cache.clear)
+
+
+# In the order they run; the database benchmarks share one database file
+BENCHMARKS = [
+    ('payoff_scalar', payoff_scalar),
+    ('payoff_array', payoff_array),
+    ('calculate_payoff_times', calculate_payoff_times),
+    ('database_point_reads', database_point_reads),
+    ('database_curve_reads', database_curve_reads),
+    ('load_payoff_times', load_payoff_times),
+    ('view_update_axes', view_update_axes)]
+
+
+def run_benchmarks(names=None, repeat=DEFAULT_REPEAT, report=None):
+    """Runs the benchmarks and returns their results.
+
+    Args:
+        names (list): The names of the benchmarks to run. Defaults to all of BENCHMARKS.
+        repeat (int): The number of times each workload is timed
+        report (function): Called with (name, result) after each benchmark
+    Returns:
+        A dict of the environment and of the result of each benchmark, with its
+        best time in seconds and its throughput in operations per second
+    """
+    results = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'repeat': repeat,
+        'benchmarks': {}}
+
+    with scaled_ranges(), tempfile.TemporaryDirectory() as directory:
+        database.initialize(os.path.join(directory, 'benchmark.db'))
+        try:
+            for name, factory in BENCHMARKS:
+                if names and name not in names:
+                    continue
+                workload = factory()
+                times = []
+                for _ in range(repeat):
+                    if workload.before is not None:
+                        workload.before()
+                    # Like timeit, keep garbage collection out of the timings
+                    gc.collect()
+                    gc.disable()
+                    try:
+                        start = time.perf_counter()
+                        workload.run()
+                        times.append(time.perf_counter() - start)
+                    finally:
+                        gc.enable()
+                best = min(times)
+                result = {
+                    'seconds': best,
+                    'operations': workload.operations,
+                    'per_second': workload.operations / best if best else float('inf')}
+                results['benchmarks'][name] = result
+                if report is not None:
+                    report(name, result)
+        finally:
+            database.db.close()
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Returns the regressions of results against baseline.
+
+    Returns:
+        A list of (name, seconds, baseline seconds) for each benchmark that is
+        more than threshold slower than its baseline. Benchmarks missing from
+        either are not compared.
+    """
+    regressions = []
+    for name, result in results['benchmarks'].items():
+        expected = baseline.get('benchmarks', {}).get(name)
+        if expected and result['seconds'] > expected['seconds'] * (1 + threshold):
+            regressions.append((name, result['seconds'], expected['seconds']))
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('names', nargs='*', metavar='NAME',
+                        help='benchmarks to run (default: all of {})'.format(
+                            ', '.join(name for name, _ in BENCHMARKS)))
+    parser.add_argument('--output', help='file to write the results to as JSON')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='results to compare against (default: {})'.format(DEFAULT_BASELINE))
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='fraction slower than the baseline that fails (default: {})'.format(
+                            DEFAULT_THRESHOLD))
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='times to run each workload (default: {})'.format(DEFAULT_REPEAT))
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='write the results to the baseline file instead of comparing')
+    args = parser.parse_args(args)
+
+    def report(name, result):
+        print("{0:<24} {1:>10.4f}s {2:>14,.0f} ops/s".format(
+            name, result['seconds'], result['per_second']))
+
+    results = run_benchmarks(args.names, repeat=args.repeat, report=report)
+    if args.output:
+        _write_json(args.output, results)
+    if args.save_baseline:
+        _write_json(args.baseline, results)
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline at {}".format(args.baseline))
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if (baseline.get('machine'), baseline.get('python')) != (results['machine'], results['python']):
+        print("Note: the baseline was recorded on {0} with Python {1}; times from other "
+              "hardware are not comparable".format(baseline.get('machine'), baseline.get('python')))
+    regressions = compare(results, baseline, args.threshold)
+    for name, seconds, expected in regressions:
+        print("REGRESSION {0}: {1:.4f}s vs. {2:.4f}s baseline ({3:+.0%})".format(
+            name, seconds, expected, seconds / expected - 1))
+    return 1 if regressions else 0
+
+
+def _write_json(path, results):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
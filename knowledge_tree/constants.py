@@ -1,4 +1,5 @@
 """Constant values for Knowledge Tree"""
+from knowledge_tree.grid_axis import GridAxis
 
 initial_balance = {
     'default': 100000,
@@ -37,6 +38,20 @@ axes_scale = {
     'y_max': 30,
     'y_step': 5
 }
+tooltip_format = '${0:,.0f}/mo, {1:.1f} yr'  # hover text of a point on the axes
+heatmap_display = {
+    'display_height': 400,
+    'display_width': 160,
+    'colorbar_width': 12,
+    'corner_x': 560,
+    'corner_y': 600,
+    'y_max': axes_scale['y_max']
+}
+heatmap_button_data = {
+    'x': 640,
+    'y': 150,
+    'text': "Show heatmap"
+}
 initial_balance_slider_data = {
     'x': 100,
     'y': 700,
@@ -53,45 +68,53 @@ interest_rate_slider_data = {
     'resolution': interest_rate['step'],
     'label': "APR"
 }
+frame_budget_ms = 16  # minimum time between redraws while a slider is dragged
+curve_cache = {
+    'max_entries': 4096,
+    'max_bytes': 32 * 1024 * 1024
+}
+
+
+def initial_balance_axis():
+    """Returns the GridAxis of initial balance values"""
+    return GridAxis.from_range(initial_balance)
+
+
+def interest_rate_axis():
+    """Returns the GridAxis of interest rate values"""
+    return GridAxis.from_range(interest_rate)
+
+
+def monthly_payment_axis():
+    """Returns the GridAxis of monthly payment values"""
+    return GridAxis.from_range(monthly_payment)
 
 
 def interest_rate_total_steps():
     """Returns the number of steps in the interest rate range"""
-    return int((interest_rate['max'] - interest_rate['min'])/interest_rate['step'])
+    return len(interest_rate_axis()) - 1
 
 
 def interest_rate_range():
-    """Generator function returning an iterator to the range of interest rate values"""
-    val = interest_rate['min']
-    while val <= interest_rate['max']:
-        yield val
-        val += interest_rate['step']
+    """Returns an iterator to the range of interest rate values"""
+    return iter(interest_rate_axis())
 
 
 def initial_balance_total_steps():
     """Returns the number of steps in the initial balance range"""
-    return int((initial_balance['max'] - initial_balance['min'])/initial_balance['step'])
+    return len(initial_balance_axis()) - 1
 
 
 def initial_balance_range():
-    """Generator function returning an iterator to the range of initial balance values"""
-    val = initial_balance['min']
-    while val <= initial_balance['max']:
-        yield val
-        val += initial_balance['step']
+    """Returns an iterator to the range of initial balance values"""
+    return iter(initial_balance_axis())
 
 
 def monthly_payment_total_steps():
     """Returns the number of steps in the monthly payment range"""
-    return int((monthly_payment['max'] - monthly_payment['min'])/monthly_payment['step'])
+    return len(monthly_payment_axis()) - 1
 
 
 def monthly_payment_range():
-    """Generator function returning an iterator to the range of monthly payment values"""
-    val = monthly_payment['min']
-    while val <= monthly_payment['max']:
-        yield val
-        val += monthly_payment['step']
-
-
-
+    """Returns an iterator to the range of monthly payment values"""
+    return iter(monthly_payment_axis())
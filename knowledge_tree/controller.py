@@ -1,6 +1,11 @@
+import time
 import tkinter as tk
 
 import knowledge_tree.constants as constants
+from knowledge_tree import instrumentation
+from knowledge_tree.scheduler import FrameScheduler
+from knowledge_tree.curve_worker import CurveWorker
+from knowledge_tree.view import View
 
 
 class Controller(object):
@@ -10,6 +15,12 @@ class Controller(object):
             raise ValueError("No value provided for main")
 
         self.main = main
+        self.curve_worker = CurveWorker(self.main.root, View.compute_curve, self.on_curve)
+        self.scheduler = FrameScheduler(self.main.root, self.render)
+        # When the oldest slider move not yet painted happened, while instrumented
+        self.slider_moved_at = None
+        # Called once the next curve has been drawn, then forgotten
+        self.on_first_curve = None
 
         self.initial_balance_slider = self.make_scale(
             command=self.on_initial_balance_slider_change,
@@ -23,22 +34,52 @@ class Controller(object):
         )
         self.interest_rate_slider.set(constants.interest_rate['default'])
 
+        self.heatmap_button = self.make_button(
+            command=self.on_heatmap_button_click, **constants.heatmap_button_data)
+
+    def render(self, balance, interest_rate):
+        """Redraws the View for new slider values"""
+        self.curve_worker.submit(balance, interest_rate)
+        self.main.view.update_heatmap(balance)
+
+    def on_curve(self, curve):
+        """Shows a curve computed by the curve worker"""
+        self.main.view.apply_curve(curve)
+        if self.slider_moved_at is not None:
+            # The Axes flush is already queued, so this runs once the curve is drawn
+            self.main.root.after_idle(self._record_slider_to_paint)
+        if self.on_first_curve is not None:
+            callback, self.on_first_curve = self.on_first_curve, None
+            self.main.root.after_idle(callback)
+
+    def _record_slider_to_paint(self):
+        if self.slider_moved_at is not None:
+            instrumentation.observe('ui.slider_to_paint_seconds',
+                                    time.perf_counter() - self.slider_moved_at)
+            self.slider_moved_at = None
+
+    def _slider_moved(self):
+        if instrumentation.enabled and self.slider_moved_at is None:
+            self.slider_moved_at = time.perf_counter()
+
+    def on_heatmap_button_click(self):
+        """Event handler for the heatmap button"""
+        if self.main.view.heatmap is None:
+            self.main.view.show_heatmap(float(self.initial_balance_slider.get()))
+            self.heatmap_button.configure(text="Hide heatmap")
+        else:
+            self.main.view.hide_heatmap()
+            self.heatmap_button.configure(text=constants.heatmap_button_data['text'])
+
     def on_initial_balance_slider_change(self, balance):
         """Event handler for the initial balance slider"""
-        balance = float(balance)
-        interest_rate = self._yearly_to_monthly(float(self.interest_rate_slider.get()))
-        self.main.view.update_axes(balance, interest_rate)
+        self._slider_moved()
+        self.scheduler.request(float(balance), float(self.interest_rate_slider.get()))
 
     def on_interest_rate_slider_change(self, interest_rate):
         """Event handler for the interest rate slider"""
-        interest_rate = float(interest_rate)
-        balance = float(self.initial_balance_slider.get())
-        self.main.view.update_axes(balance, interest_rate)
-
-    @staticmethod
-    def _yearly_to_monthly(rate):
-        """Converts a yearly interest rate to a onthly interest rate"""
-        return rate / 12
+        self._slider_moved()
+        self.scheduler.request(float(self.initial_balance_slider.get()), float(interest_rate))
 
     def make_button(self, x, y, command=None, text=None):
         """Creates and places a button on the canvas
@@ -0,0 +1,105 @@
+import threading
+from collections import OrderedDict
+
+import knowledge_tree.constants as constants
+from knowledge_tree import instrumentation
+
+
+class CurveCache(object):
+    """Bounded least-recently-used cache of whole curves keyed by (balance, rate).
+
+    Keys are the grid values of the balance and rate, computed from their step
+    indexes on the axes of the data the curves come from, so values that differ
+    only by float noise share an entry. With snap, off-grid values are quantized
+    to the nearest step and the curve is computed for that step; without it
+    they raise ValueError, as an uncached lookup would. The cache is safe to
+    share between threads. It does not notice when the ranges in constants
+    change; clear it when they do.
+
+    Attributes:
+        max_entries (int): The most curves to hold, or None for no limit
+        max_bytes   (int): The most bytes of curve data to hold, or None for no limit
+        snap        (bool): Whether to quantize off-grid values
+        nbytes      (int): The bytes of curve data currently held
+        hits        (int)
+        misses      (int)
+        evictions   (int)
+
+    Public methods:
+        CurveCache(max_entries=..., max_bytes=..., snap=False)
+        get(balance, rate, compute, axes=None)
+        clear()
+    """
+    def __init__(self, max_entries=constants.curve_cache['max_entries'],
+                 max_bytes=constants.curve_cache['max_bytes'], snap=False):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.snap = snap
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, balance, rate, compute, axes=None):
+        """Returns the curve for balance and rate, computing it on a miss.
+
+        Args:
+            balance (numeric): The initial balance
+            rate (numeric): The interest rate
+            compute (function): Called as compute(balance, rate) with the grid
+                values of the key to calculate a missing curve
+            axes (tuple): The (balance, rate) GridAxis pair of the data compute
+                reads. Defaults to the axes in constants.
+        """
+        if axes is None:
+            axes = (constants.initial_balance_axis(), constants.interest_rate_axis())
+        balance_axis, rate_axis = axes
+        key = (balance_axis[balance_axis.index_of(balance, snap=self.snap)],
+               rate_axis[rate_axis.index_of(rate, snap=self.snap)])
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                instrumentation.count('curve_cache.hits')
+                return self._entries[key]
+            self.misses += 1
+        instrumentation.count('curve_cache.misses')
+
+        curve = compute(*key)
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = curve
+                self.nbytes += _nbytes(curve)
+                self._evict()
+        return curve
+
+    def clear(self):
+        """Removes all of the cached curves"""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self):
+        """Removes least recently used curves until the cache is within its limits"""
+        while self._entries and (
+                (self.max_entries is not None and len(self._entries) > self.max_entries) or
+                (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+            key, curve = self._entries.popitem(last=False)
+            self.nbytes -= _nbytes(curve)
+            self.evictions += 1
+
+
+def _nbytes(curve):
+    """Returns the approximate size of a curve: an array, a list of pairs, or a tuple of either"""
+    if hasattr(curve, 'nbytes'):
+        return curve.nbytes
+    if isinstance(curve, tuple):
+        return sum(_nbytes(part) for part in curve)
+    return 16 * 2 * len(curve)
@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import knowledge_tree.constants as constants
+from knowledge_tree import instrumentation
+
+
+class CurveWorker(object):
+    """Computes curves off of the Tk thread and hands the results back to it.
+
+    Every request is tagged with a generation number. At most one request is
+    computed at a time; requests that arrive meanwhile replace each other, and
+    only the newest is started once the worker is free. A finished result is
+    only applied if no newer request has been made since, so stale curves are
+    never drawn. Results are collected by polling from the Tk event loop,
+    because Tk may only be called from the thread running mainloop.
+
+    Attributes:
+        root        (tk.Tk): The window whose event loop applies the results
+        compute     (function): Called on the executor with the request arguments;
+            must be picklable when a process pool is used
+        on_result   (function): Called on the Tk thread with the result of compute
+        executor    (concurrent.futures.Executor): Runs compute. Defaults to a
+            single background thread.
+        poll_ms     (int): How often to check for a finished result
+        generation  (int): The generation of the newest request
+        stale       (int): The number of results dropped because they were superseded
+        failed      (int): The number of requests whose compute raised an exception
+        last_error  (Exception): The exception of the most recent failed request, or None
+
+    Public methods:
+        submit(*args)
+        shutdown()
+    """
+    def __init__(self, root, compute, on_result, executor=None, poll_ms=constants.frame_budget_ms):
+        self.root = root
+        self.compute = compute
+        self.on_result = on_result
+        self.executor = executor or ThreadPoolExecutor(max_workers=1)
+        self.poll_ms = poll_ms
+        self.generation = 0
+        self.stale = 0
+        self.failed = 0
+        self.last_error = None
+        self._latest = None
+        self._in_flight = None
+        self._after_id = None
+
+    def submit(self, *args):
+        """Requests a new result, superseding all earlier requests"""
+        self.generation += 1
+        self._latest = (self.generation, args)
+        if self._in_flight is None:
+            self._start_latest()
+
+    def shutdown(self):
+        """Stops polling and shuts down the executor, abandoning any pending request"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self._latest = self._in_flight = None
+        self.executor.shutdown(wait=False)
+
+    def _start_latest(self):
+        generation, args = self._latest
+        self._latest = None
+        self._in_flight = (generation, self.executor.submit(self.compute, *args))
+        self._after_id = self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        """Applies the in-flight result once it is ready, then starts the newest request"""
+        self._after_id = None
+        generation, future = self._in_flight
+        if not future.done():
+            self._after_id = self.root.after(self.poll_ms, self._poll)
+            return
+
+        self._in_flight = None
+        try:
+            result = future.result()
+        except Exception as error:
+            # A bad request must not stop the requests queued behind it
+            self.failed += 1
+            self.last_error = error
+            instrumentation.count('curve_worker.failures')
+        else:
+            if generation == self.generation:
+                self.on_result(result)
+            else:
+                self.stale += 1
+
+        if self._latest is not None:
+            self._start_latest()
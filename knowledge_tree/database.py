@@ -0,0 +1,274 @@
+"""Persistent storage of payoff time data for Knowledge Tree"""
+import math
+import time
+from itertools import islice
+
+import peewee
+
+import knowledge_tree.constants as constants
+from knowledge_tree import instrumentation
+
+
+SCHEMA_VERSION = 2
+DEFAULT_BATCH_SIZE = 240         # rows per INSERT; 4 columns each stays under SQLite's 999 variables
+DEFAULT_COMMIT_INTERVAL = 100000  # rows per transaction
+DEFAULT_PURGE_CHUNK_SIZE = 10     # initial balances per DELETE
+# Tuned for a large table that is written once and then read many times
+PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'cache_size': -64 * 1024,       # KiB, i.e. 64 MiB of page cache
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory'}
+
+db = peewee.SqliteDatabase(None)
+
+
+class BaseModel(peewee.Model):
+    class Meta:
+        database = db
+
+
+class DataPoint(BaseModel):
+    """A single payoff time, in months, for one (initial balance, interest rate,
+    monthly payment) cell of the grid.
+
+    The table is keyed on (Bo, r, p) and stored WITHOUT ROWID, so rows are
+    clustered by key and the payment curve for one (Bo, r) is a single range
+    scan of the primary key. Key values must be snapped onto the grid with
+    snap_to_grid so that lookups compare equal."""
+    Bo = peewee.FloatField()
+    r = peewee.FloatField()
+    p = peewee.FloatField()
+    t = peewee.FloatField()
+
+    class Meta:
+        primary_key = peewee.CompositeKey('Bo', 'r', 'p')
+        without_rowid = True
+
+
+class IngestStats(object):
+    """Progress of a bulk insert
+
+    Attributes:
+        rows    (int): The number of rows committed so far
+        seconds (float): The time elapsed since the insert started
+    """
+    def __init__(self):
+        self.rows = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        if self.seconds == 0:
+            return 0.0
+        return self.rows / self.seconds
+
+
+def initialize(filename):
+    """Opens the database file, migrating it to the current schema if necessary"""
+    db.init(filename, pragmas=PRAGMAS)
+    db.connect(reuse_if_open=True)
+    migrate()
+    return db
+
+
+def migrate():
+    """Brings the open database up to SCHEMA_VERSION.
+
+    Version 1 databases keyed DataPoints on an id computed from the grid
+    position. Their rows are copied into the keyed table, with the drifting
+    float values of Bo, r, and p snapped onto the grid.
+    """
+    version = db.execute_sql('PRAGMA user_version').fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+
+    table = DataPoint._meta.table_name
+    with db.atomic():
+        if table in db.get_tables() and 'id' in [c.name for c in db.get_columns(table)]:
+            db.execute_sql('ALTER TABLE "{0}" RENAME TO "{0}_v1"'.format(table))
+            db.create_tables([DataPoint])
+
+            snapped, params = [], []
+            for column, axis in _grid_axes().items():
+                snapped.append('? + ROUND(("{0}" - ?) / ?) * ?'.format(column))
+                params.extend((axis.min, axis.min, axis.step, axis.step))
+            db.execute_sql(
+                'INSERT OR REPLACE INTO "{0}" ("Bo", "r", "p", "t") '
+                'SELECT {1}, "t" FROM "{0}_v1"'.format(table, ', '.join(snapped)),
+                params)
+            db.execute_sql('DROP TABLE "{0}_v1"'.format(table))
+        else:
+            db.create_tables([DataPoint], safe=True)
+        db.execute_sql('PRAGMA user_version = {}'.format(SCHEMA_VERSION))
+
+
+def decimal_to_int(value):
+    """Converts a decimal value to an integer number of ten-thousandths"""
+    return int(round(value * 10000))
+
+
+def int_to_decimal(value):
+    """Converts an integer number of ten-thousandths back to a decimal value"""
+    return value / 10000
+
+
+def get_num_steps(min_val, max_val, step, val):
+    """Returns the number of steps of size step from min_val to val
+
+    Raises:
+        ValueError: Raised if the range is empty, or val is outside of the range
+            or does not fall on a step
+    """
+    if min_val > max_val:
+        raise ValueError("min {} is greater than max {}".format(min_val, max_val))
+    if not min_val <= val <= max_val:
+        raise ValueError("{} is outside of the range [{}, {}]".format(val, min_val, max_val))
+
+    num_steps, remainder = divmod(
+        decimal_to_int(val) - decimal_to_int(min_val),
+        decimal_to_int(step))
+    if remainder:
+        raise ValueError("{} is not a step of size {} from {}".format(val, step, min_val))
+    return num_steps
+
+
+def snap_to_grid(value, axis):
+    """Returns the grid value of the step that value falls on. Stored and queried
+    values both come from the GridAxis, so they compare equal.
+
+    Args:
+        value (numeric)
+        axis (GridAxis): One of the axes in constants
+
+    Raises:
+        ValueError: Raised if value is not on the axis
+    """
+    return axis[axis.index_of(value)]
+
+
+def create_point(Bo, r, p, t):
+    """Inserts a single DataPoint"""
+    return DataPoint.create(Bo=Bo, r=r, p=p, t=t)
+
+
+def bulk_insert_points(rows, batch_size=DEFAULT_BATCH_SIZE,
+                       commit_interval=DEFAULT_COMMIT_INTERVAL, report=None):
+    """Streams rows into the DataPoint table using multi-row inserts.
+
+    Args:
+        rows (iterable): (Bo, r, p, t) tuples. May be a generator; at most
+            batch_size rows are held in memory at a time.
+        batch_size (int): The number of rows per INSERT statement
+        commit_interval (int): The number of rows per transaction
+        report (function): Called with the IngestStats after each commit
+    Returns:
+        The final IngestStats
+    """
+    fields = [DataPoint.Bo, DataPoint.r, DataPoint.p, DataPoint.t]
+    rows = iter(rows)
+    stats = IngestStats()
+    start = time.perf_counter()
+
+    # Each transaction's first batch is read before it is opened, so running
+    # out of rows never opens an empty transaction
+    batch = list(islice(rows, min(batch_size, commit_interval)))
+    while batch:
+        committed = 0
+        with db.atomic():
+            while batch:
+                DataPoint.insert_many(batch, fields=fields).execute()
+                instrumentation.count('database.round_trips')
+                committed += len(batch)
+                if committed >= commit_interval:
+                    break
+                batch = list(islice(rows, min(batch_size, commit_interval - committed)))
+
+        stats.rows += committed
+        instrumentation.count('database.rows_inserted', committed)
+        stats.seconds = time.perf_counter() - start
+        if report is not None:
+            report(stats)
+        batch = list(islice(rows, min(batch_size, commit_interval)))
+    return stats
+
+
+def purge_points(chunk_size=DEFAULT_PURGE_CHUNK_SIZE, truncate=False, reclaim_space=False):
+    """Generator function returning an iterator that deletes ALL of the DataPoints.
+
+    Points are deleted in key ranges covering chunk_size initial balances, one
+    statement and one transaction per range, and the iterator yields the
+    percent done after each range. With truncate the table is dropped and
+    recreated in a single step instead.
+
+    Args:
+        chunk_size (int): The number of initial balance steps covered by each DELETE
+        truncate (bool): Drop and recreate the table instead of deleting ranges
+        reclaim_space (bool): VACUUM the database file afterwards so that it
+            shrinks back down
+    """
+    if truncate:
+        with db.atomic():
+            db.drop_tables([DataPoint])
+            db.create_tables([DataPoint])
+    else:
+        first_Bo, last_Bo = (DataPoint
+                             .select(peewee.fn.MIN(DataPoint.Bo), peewee.fn.MAX(DataPoint.Bo))
+                             .scalar(as_tuple=True))
+        if first_Bo is not None:
+            step = constants.initial_balance_axis().step
+            width = chunk_size * step
+            span = last_Bo - first_Bo + step
+            start = first_Bo
+            while start <= last_Bo:
+                with db.atomic():
+                    (DataPoint
+                     .delete()
+                     .where((DataPoint.Bo >= start) & (DataPoint.Bo < start + width))
+                     .execute())
+                instrumentation.count('database.round_trips')
+                start += width
+                percent = math.floor(100 * min(start - first_Bo, span) / span)
+                # 100 is only reported once everything, including any VACUUM, is done
+                if percent < 100:
+                    yield percent
+
+    if reclaim_space:
+        db.execute_sql('VACUUM')
+    yield 100
+
+
+def get_payoff_time(Bo, r, p):
+    """Returns the payoff time for given values of Bo, r, and p
+
+    Raises:
+        ValueError: Raised if the values are off the grid, or no DataPoint exists for them
+    """
+    Bo, r, p = (snap_to_grid(value, axis) for value, axis in zip((Bo, r, p), _grid_axes().values()))
+    point = DataPoint.get_or_none(
+        (DataPoint.Bo == Bo) & (DataPoint.r == r) & (DataPoint.p == p))
+    instrumentation.count('database.round_trips')
+    if point is None:
+        raise ValueError("No DataPoint exists with Bo={}, r={}, p={}".format(Bo, r, p))
+    return point.t
+
+
+def get_time_vs_payment_data(Bo, r):
+    """Returns the (payment, payoff time) pairs stored for given values of Bo and r"""
+    query = (DataPoint
+             .select(DataPoint.p, DataPoint.t)
+             .where((DataPoint.Bo == snap_to_grid(Bo, constants.initial_balance_axis())) &
+                    (DataPoint.r == snap_to_grid(r, constants.interest_rate_axis())))
+             .order_by(DataPoint.p)
+             .tuples())
+    instrumentation.count('database.round_trips')
+    return list(query)
+
+
+def _grid_axes():
+    """Returns the constants GridAxis for each of the key columns, in key order"""
+    return {
+        'Bo': constants.initial_balance_axis(),
+        'r': constants.interest_rate_axis(),
+        'p': constants.monthly_payment_axis()}
@@ -1,4 +1,51 @@
-import math
+import numpy as np
+
+from knowledge_tree import instrumentation
+
+
+# Bump whenever a change to payments_to_payoff_array changes its results, so that
+# stored grids calculated with the old formula are recalculated
+FORMULA_VERSION = 1
+
+
+def payments_to_payoff_array(a, i, p):
+    """Returns the number of payments required to reach zero balance, elementwise
+
+    The arguments may be scalars or array-likes of any shape that broadcast
+    against each other, so a whole curve or grid is computed in a single pass.
+
+    Args:
+        a: The initial loan balance(s)
+        i: The interest rate(s) per payment period (NOT per year)
+        p: The payment(s) per payment period
+
+    Returns:
+        A float ndarray of the broadcast shape. Cells for loans that never
+        reach zero balance (zero payment, or a payment that does not cover the
+        interest, i.e. a log domain error) hold inf. Cells whose inputs are
+        otherwise outside of the domain of the formula hold nan.
+    """
+    a, i, p = np.broadcast_arrays(
+        np.asarray(a, dtype=float),
+        np.asarray(i, dtype=float),
+        np.asarray(p, dtype=float))
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        remaining = 1 - i * a / p
+        result = np.where(
+            i == 0,
+            # With no interest the balance simply falls by p each period
+            a / p,
+            -np.log(remaining) / np.log1p(i))
+
+    never = ((p == 0) | (remaining <= 0)) & (a > 0)
+    result = np.where(never, np.inf, result)
+    result = np.where(a == 0, 0.0, result)
+    if instrumentation.enabled:
+        instrumentation.count('payoff.cells', result.size)
+        instrumentation.count('payoff.log_domain_failures',
+                              int(np.count_nonzero((remaining <= 0) & (a > 0) & (p != 0))))
+    return result
 
 
 def payments_to_payoff(a, i, p):
@@ -9,6 +56,9 @@ def payments_to_payoff(a, i, p):
         i: The interest rate per payment period (NOT per year)
         p: The payment per payment period
 
+    Returns:
+        The number of payments as a float, or None if the loan is never paid off
+
     Raises:
         AssertionError: Raised in the event that any of the three arguments are non-numeric
     """
@@ -16,19 +66,11 @@ def payments_to_payoff(a, i, p):
     assert type(i) == int or type(i) == float, "type of i is {}".format(type(i))
     assert type(p) == int or type(p) == float, "type of p is {}".format(type(p))
 
-    if p == 0:
-        print("p is 0")
-        return None
-
-    try:
-        numerator = -math.log(1 - i * a / p)
-        denominator = math.log(1 + i)
-        result = numerator / denominator
-        print("payments_to_payoff({}, {}, {}) => {}".format(a, i, p, result))
-        return result
-    except ValueError:
-        print("payments_to_payoff({}, {}, {}) => Log domain error".format(a, i, p))
+    instrumentation.count('payoff.calls')
+    result = float(payments_to_payoff_array(a, i, p))
+    if not np.isfinite(result):
         return None
+    return result
 
 
 def decimal_range(start, stop, step):
@@ -36,4 +78,3 @@ def decimal_range(start, stop, step):
     while next_val < stop:
         yield next_val
         next_val += step
-
@@ -0,0 +1,123 @@
+import numpy as np
+
+
+class GridAxis(object):
+    """An evenly spaced axis of grid values, min + k*step for k in range(count).
+
+    Values are always computed from their integer index rather than by repeated
+    addition, so they do not drift and the same value is produced everywhere it
+    is computed. Mapping between values and indexes is constant-time arithmetic,
+    and the axis behaves like a read-only sequence without materializing a list.
+
+    Attributes:
+        min     (float): The first value on the axis
+        step    (float): The spacing between values
+        count   (int): The number of values on the axis
+
+    Public methods:
+        GridAxis(min=0, step=1, count=1)
+        GridAxis.from_range(value_range)
+        index_of(value, snap=False)
+        indexes_of(values, snap=False)
+        snap(value)
+        values()
+        max (property)
+    """
+    TOLERANCE = 1e-6    # fraction of a step a value may be off the grid and still match
+
+    def __init__(self, min=0, step=1, count=1):
+        if step <= 0:
+            raise ValueError("step must be positive, not {}".format(step))
+        if count < 1:
+            raise ValueError("count must be at least 1, not {}".format(count))
+        self.min = float(min)
+        self.step = float(step)
+        self.count = int(count)
+
+    @classmethod
+    def from_range(cls, value_range):
+        """Creates the axis for one of the ranges in constants
+
+        Args:
+            value_range (dict): A range with 'min', 'max', and 'step' keys
+        """
+        count = int(round((value_range['max'] - value_range['min']) / value_range['step'])) + 1
+        return cls(value_range['min'], value_range['step'], count)
+
+    @property
+    def max(self):
+        return self[-1]
+
+    def index_of(self, value, snap=False):
+        """Returns the index of value on the axis.
+
+        Args:
+            value (numeric)
+            snap (bool): Return the index of the nearest value, clamped to the
+                ends of the axis, instead of requiring value to be on the grid
+
+        Raises:
+            ValueError: Raised if snap is False and value is not within
+                TOLERANCE of a value on the axis
+        """
+        steps = (value - self.min) / self.step
+        index = int(round(steps))
+        if snap:
+            return min(max(index, 0), self.count - 1)
+        if abs(steps - index) > self.TOLERANCE or not 0 <= index < self.count:
+            raise ValueError("{} is not on the axis {!r}".format(value, self))
+        return index
+
+    def indexes_of(self, values, snap=False):
+        """Returns an integer array of the indexes of an array of values. See index_of."""
+        steps = (np.asarray(values, dtype=float) - self.min) / self.step
+        indexes = np.rint(steps).astype(np.intp)
+        if snap:
+            return np.clip(indexes, 0, self.count - 1)
+        off_axis = (np.abs(steps - indexes) > self.TOLERANCE) | (indexes < 0) | (indexes >= self.count)
+        if off_axis.any():
+            value = np.asarray(values, dtype=float).reshape(-1)[off_axis.reshape(-1)][0]
+            raise ValueError("{} is not on the axis {!r}".format(value, self))
+        return indexes
+
+    def snap(self, value):
+        """Returns the axis value nearest to value"""
+        return self[self.index_of(value, snap=True)]
+
+    def values(self):
+        """Returns an array of all of the values on the axis"""
+        return self.min + np.arange(self.count) * self.step
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, stride = key.indices(self.count)
+            if stride < 0:
+                raise ValueError("GridAxis does not support reversed slices")
+            count = len(range(start, stop, stride))
+            if count < 1:
+                raise ValueError("GridAxis cannot be empty")
+            return GridAxis(self[start], self.step * stride, count)
+
+        if key < 0:
+            key += self.count
+        if not 0 <= key < self.count:
+            raise IndexError("GridAxis index out of range")
+        return self.min + key * self.step
+
+    def __iter__(self):
+        for k in range(self.count):
+            yield self.min + k * self.step
+
+    def __eq__(self, other):
+        if not isinstance(other, GridAxis):
+            return NotImplemented
+        return (self.min, self.step, self.count) == (other.min, other.step, other.count)
+
+    def __hash__(self):
+        return hash((self.min, self.step, self.count))
+
+    def __repr__(self):
+        return "GridAxis(min={}, step={}, count={})".format(self.min, self.step, self.count)
@@ -0,0 +1,345 @@
+import os
+import struct
+
+import numpy as np
+
+import knowledge_tree.constants as constants
+from knowledge_tree.grid_axis import GridAxis
+from knowledge_tree.financial_tools import FORMULA_VERSION, payments_to_payoff_array
+from knowledge_tree.payoff_table import PayoffTable
+from knowledge_tree import quantization
+
+
+MAGIC = b'KTGRID'
+FORMAT_VERSION = 3
+# magic, format version, formula version, encoding, then (min, step, count)
+# for the balance, rate and payment axes
+HEADER = struct.Struct('<6sHHH' + 'ddq' * 3)
+# Version 2 headers had no encoding, and version 1 headers no formula version either
+HEADER_V2 = struct.Struct('<6sHH' + 'ddq' * 3)
+HEADER_V1 = struct.Struct('<6sH' + 'ddq' * 3)
+DATA_OFFSET = 128
+DTYPE = np.dtype('<f4')
+# The ways the payoff times can be stored, in the order of their header codes:
+# float32 months, or whole months quantized to uint16 (see quantization)
+ENCODINGS = ('float32', 'months')
+
+
+class GridStore(object):
+    """Dense, memory-mapped store of payoff times for the whole grid of
+    (initial balance, interest rate, monthly payment) values.
+
+    The payoff times are laid out as a 3-D array indexed by (balance step,
+    rate step, payment step) and written once to a versioned binary file.
+    Opening a store only maps the file, so lookups page in just the slices
+    they touch. Payoff times are in months; loans that are never paid off
+    are stored as inf.
+
+    With the 'months' encoding each time is rounded to a whole number of
+    months and stored as a uint16, half the size of the default 'float32'
+    encoding. Reads decode just the cells they touch.
+
+    The header records the axes and the version of the payoff formula, so a
+    store can be brought up to date with changed ranges by update, which
+    only calculates the cells that the old store does not already hold.
+
+    Attributes:
+        path    (str): The file backing the store
+        axes    (dict): Stores the GridAxis of each of the axes, keyed by 'Bo', 'r', and 'p'
+        data    (np.memmap): The stored payoff times, with shape (balance count,
+            rate count, payment count)
+        encoding (str): How the times are stored, one of ENCODINGS
+        formula_version (int): The FORMULA_VERSION the times were calculated
+            with, or None for stores written before it was recorded
+
+    Public methods:
+        GridStore.build(path, initial_balance=None, interest_rate=None, monthly_payment=None,
+            encoding='float32')
+        GridStore.update(path, initial_balance=None, interest_rate=None, monthly_payment=None,
+            encoding='float32')
+        GridStore.create(path, axes, encoding='float32')
+        GridStore.open(path, writable=False)
+        times (property)
+        write(start, stop, times)
+        index_of(axis, value)
+        get_payoff_time(Bo=0, r=0, p=0)
+        get_time_vs_payment_data(Bo=0, r=0)
+        as_table(lazy=False)
+    """
+    def __init__(self, path, axes, data, formula_version=FORMULA_VERSION, encoding='float32'):
+        self.path = path
+        self.axes = axes
+        self.data = data
+        self.formula_version = formula_version
+        self.encoding = encoding
+
+    @classmethod
+    def build(cls, path, initial_balance=None, interest_rate=None, monthly_payment=None,
+              encoding='float32'):
+        """Calculates the payoff time for every cell of the grid and writes the store to path.
+
+        Args:
+            path (str): The file to write
+            initial_balance, interest_rate, monthly_payment (dict): Ranges with 'min',
+                'max', and 'step' keys. Default to the ranges in constants.
+            encoding (str): How to store the times, one of ENCODINGS
+        Returns:
+            The opened GridStore
+        """
+        axes = _axes_from_ranges(initial_balance, interest_rate, monthly_payment)
+
+        store = cls.create(path, axes, encoding)
+        for k in range(len(axes['Bo'])):
+            store.write(k, k + 1, compute_slab(axes, k, k + 1))
+        store.data.flush()
+        return cls.open(path)
+
+    @classmethod
+    def update(cls, path, initial_balance=None, interest_rate=None, monthly_payment=None,
+               encoding=None):
+        """Brings the store at path up to date with changed ranges.
+
+        Cells whose (Bo, r, p) values are on both the old and the new axes are
+        copied from the old store, only the remaining cells are calculated, and
+        cells that are no longer on the axes are dropped. The whole grid is
+        calculated if there is no store at path yet, or it was calculated with
+        a different FORMULA_VERSION or stored with a different encoding. Either
+        way the new store is written beside the old one and moved into place
+        once it is complete, so an interrupted update leaves the old store intact.
+
+        Args:
+            path (str): The store file to update
+            initial_balance, interest_rate, monthly_payment (dict): Ranges with 'min',
+                'max', and 'step' keys. Default to the ranges in constants.
+            encoding (str): How to store the times, one of ENCODINGS. Defaults
+                to the encoding of the existing store, or 'float32' for a new one.
+        Returns:
+            (store, calculated) where store is the opened GridStore and
+            calculated is the number of cells that had to be calculated
+        """
+        axes = _axes_from_ranges(initial_balance, interest_rate, monthly_payment)
+        try:
+            old = cls.open(path)
+        except (OSError, ValueError):
+            old = None
+        if encoding is None:
+            encoding = old.encoding if old is not None else 'float32'
+        if old is not None and old.formula_version == FORMULA_VERSION and \
+                old.encoding == encoding and old.axes == axes:
+            return old, 0
+
+        temporary_path = path + '.update'
+        if old is None or old.formula_version != FORMULA_VERSION or old.encoding != encoding:
+            store = cls.build(temporary_path, initial_balance, interest_rate, monthly_payment,
+                              encoding)
+            calculated = store.data.size
+            del old, store
+            os.replace(temporary_path, path)
+            return cls.open(path), calculated
+
+        matches = {name: match_axis(old.axes[name], axes[name]) for name in ('Bo', 'r', 'p')}
+        on_old = {name: matches[name] >= 0 for name in matches}
+        old_rates = np.ix_(on_old['r'], on_old['p'])
+        old_index = np.ix_(matches['r'][on_old['r']], matches['p'][on_old['p']])
+        rates = axes['r'].values()[:, None] / 12
+        payments = axes['p'].values()[None, :]
+
+        store = cls.create(temporary_path, axes, encoding)
+        calculated = 0
+        for k, balance in enumerate(axes['Bo'].values()):
+            if not on_old['Bo'][k]:
+                store.write(k, k + 1, compute_slab(axes, k, k + 1))
+                calculated += store.data[k].size
+                continue
+
+            slab = np.empty(store.data.shape[1:], dtype=DTYPE)
+            slab[old_rates] = old.decode(old.data[matches['Bo'][k]][old_index])
+            # New rates need every payment, old rates only the new payments
+            new_rates = ~on_old['r']
+            slab[new_rates] = payments_to_payoff_array(balance, rates[new_rates], payments)
+            new_payments = np.ix_(on_old['r'], ~on_old['p'])
+            slab[new_payments] = payments_to_payoff_array(
+                balance, rates[on_old['r']], payments[:, ~on_old['p']])
+            store.write(k, k + 1, slab[None])
+            calculated += slab.size - int(on_old['r'].sum()) * int(on_old['p'].sum())
+        store.data.flush()
+
+        del old, store
+        os.replace(temporary_path, path)
+        return cls.open(path), calculated
+
+    @classmethod
+    def create(cls, path, axes, encoding='float32'):
+        """Writes the header of a new store and allocates, without calculating, its data.
+
+        Args:
+            path (str): The file to write
+            axes (dict): The GridAxis of each axis, keyed by 'Bo', 'r', and 'p'
+            encoding (str): How to store the times, one of ENCODINGS
+        Returns:
+            The GridStore, opened for writing
+        """
+        if encoding not in ENCODINGS:
+            raise ValueError("Unknown encoding {!r}".format(encoding))
+        shape = tuple(len(axes[name]) for name in ('Bo', 'r', 'p'))
+        with open(path, 'wb') as f:
+            f.write(_pack_header(axes, encoding))
+            f.truncate(DATA_OFFSET + int(np.prod(shape)) * _dtype(encoding).itemsize)
+        return cls.open(path, writable=True)
+
+    @classmethod
+    def open(cls, path, writable=False):
+        """Maps an existing store file into memory.
+
+        Raises:
+            ValueError: Raised if the file is not a grid store, or was written
+                with an unsupported format version
+        """
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError("{} is not a grid store".format(path))
+
+        magic, version = struct.unpack_from('<6sH', header)
+        if magic != MAGIC:
+            raise ValueError("{} is not a grid store".format(path))
+        if version == FORMAT_VERSION:
+            formula_version, code, *axis_data = HEADER.unpack(header)[2:]
+        elif version == 2:
+            code = 0
+            formula_version, *axis_data = HEADER_V2.unpack_from(header)[2:]
+        elif version == 1:
+            code, formula_version, axis_data = 0, None, HEADER_V1.unpack_from(header)[2:]
+        else:
+            raise ValueError("Unsupported grid store version {}".format(version))
+        if code >= len(ENCODINGS):
+            raise ValueError("Unsupported grid store encoding {}".format(code))
+        encoding = ENCODINGS[code]
+
+        axes = {}
+        for n, name in enumerate(('Bo', 'r', 'p')):
+            axis_min, step, count = axis_data[3 * n:3 * n + 3]
+            axes[name] = GridAxis(axis_min, step, count)
+        shape = tuple(len(axes[name]) for name in ('Bo', 'r', 'p'))
+
+        data = np.memmap(path, dtype=_dtype(encoding), mode='r+' if writable else 'r',
+                         offset=DATA_OFFSET, shape=shape)
+        return cls(path, axes, data, formula_version, encoding)
+
+    @property
+    def times(self):
+        """The payoff times in months. With the default encoding this is the
+        memory-mapped data itself; otherwise the whole grid is decoded into memory."""
+        if self.encoding == 'float32':
+            return self.data
+        return self.decode(self.data)
+
+    def decode(self, data):
+        """Returns the payoff times in months of some of the stored data"""
+        if self.encoding == 'float32':
+            return np.asarray(data)
+        return quantization.decode_months(data)
+
+    def write(self, start, stop, times):
+        """Encodes and stores the payoff times of the initial balance steps start to stop"""
+        if self.encoding == 'float32':
+            self.data[start:stop] = times
+        else:
+            self.data[start:stop] = quantization.encode_months(times)
+
+    def index_of(self, axis, value):
+        """Returns the step index of value along the named axis.
+
+        Raises:
+            ValueError: Raised if value does not lie on a step of the axis
+        """
+        return self.axes[axis].index_of(value)
+
+    def get_payoff_time(self, Bo=0, r=0, p=0):
+        """Gets the payoff time in months for given values of Bo, r, and p.
+
+        Raises:
+            ValueError: Raised if the point is off the grid or is never paid off
+        """
+        t = float(self.decode(self.data[self.index_of('Bo', Bo), self.index_of('r', r),
+                                        self.index_of('p', p)]))
+        if not np.isfinite(t):
+            raise ValueError("Bo={}, r={}, p={} is never paid off".format(Bo, r, p))
+        return t
+
+    def get_time_vs_payment_data(self, Bo=0, r=0):
+        """Gets the (payment, payoff time) pairs for given values of Bo and r.
+
+        Payments for which the loan is never paid off are left out.
+        """
+        curve = self.decode(self.data[self.index_of('Bo', Bo), self.index_of('r', r)])
+        payments = self.axes['p'].values()
+        finite = np.isfinite(curve)
+        return list(zip(payments[finite].tolist(), curve[finite].tolist()))
+
+    def as_table(self, lazy=False):
+        """Returns a PayoffTable of the payoff times, backed by the memory-mapped
+        array unless the times have to be decoded.
+
+        With lazy, encoded times are decoded as cells are read rather than all
+        at once, which suits a few lookups such as an interpolation. The times
+        of such a table can only be indexed.
+        """
+        times = _DecodedTimes(self) if lazy and self.encoding != 'float32' else self.times
+        return PayoffTable(self.axes['Bo'], self.axes['r'], self.axes['p'], times=times)
+
+
+class _DecodedTimes(object):
+    """Indexes the data of a store like an array of its payoff times, decoding
+    only the cells that are indexed"""
+    def __init__(self, store):
+        self.store = store
+        self.shape = store.data.shape
+
+    def __getitem__(self, index):
+        return self.store.decode(self.store.data[index])
+
+
+def compute_slab(axes, start, stop):
+    """Calculates the payoff times of the initial balance steps start to stop.
+
+    Returns:
+        A float32 array with shape (stop - start, rate count, payment count)
+    """
+    balances = axes['Bo'].values()[start:stop, None, None]
+    rates = axes['r'].values()[None, :, None]
+    payments = axes['p'].values()[None, None, :]
+    return payments_to_payoff_array(balances, rates / 12, payments).astype(DTYPE)
+
+
+def match_axis(old, new):
+    """Returns an integer array holding, for each value on the new axis, the
+    index of the same value on the old axis, or -1 if the old axis lacks it"""
+    steps = (new.values() - old.min) / old.step
+    indexes = np.rint(steps).astype(np.intp)
+    on_old = ((np.abs(steps - indexes) <= GridAxis.TOLERANCE) &
+              (indexes >= 0) & (indexes < len(old)))
+    return np.where(on_old, indexes, -1)
+
+
+def _axes_from_ranges(initial_balance=None, interest_rate=None, monthly_payment=None):
+    """Returns the GridAxis of each axis, defaulting to the ranges in constants"""
+    return {
+        'Bo': GridAxis.from_range(initial_balance or constants.initial_balance),
+        'r': GridAxis.from_range(interest_rate or constants.interest_rate),
+        'p': GridAxis.from_range(monthly_payment or constants.monthly_payment)}
+
+
+def _dtype(encoding):
+    """Returns the dtype of the data stored with an encoding"""
+    return DTYPE if encoding == 'float32' else quantization.DTYPE
+
+
+def _pack_header(axes, encoding='float32'):
+    """Packs the header and pads it to the start of the data"""
+    axis_data = []
+    for name in ('Bo', 'r', 'p'):
+        axis_data.extend((axes[name].min, axes[name].step, axes[name].count))
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, FORMULA_VERSION, ENCODINGS.index(encoding),
+                         *axis_data)
+    return header.ljust(DATA_OFFSET, b'\0')
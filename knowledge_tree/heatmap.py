@@ -0,0 +1,140 @@
+import tkinter as tk
+
+import numpy as np
+
+import knowledge_tree.constants as constants
+from knowledge_tree.financial_tools import payments_to_payoff_array
+
+
+# Colors of the scale from the shortest to the longest payoff time
+COLOR_STOPS = np.array([
+    (68, 1, 84),
+    (59, 82, 139),
+    (33, 145, 140),
+    (94, 201, 98),
+    (253, 231, 37)], dtype=float)
+NEVER_PAID_OFF_COLOR = (200, 200, 200)
+
+
+class Heatmap(object):
+    """Draws the payoff time of every (interest rate, monthly payment) cell at one
+    initial balance as a single raster image on a tkinter Canvas.
+
+    The whole plane is computed in one vectorized pass and written into one
+    tk.PhotoImage, so redrawing costs the same however many cells there are.
+    Payments run along the x direction and interest rates up the y direction.
+    A color scale is drawn to the right of the image.
+
+    Attributes:
+        canvas              (tk.Canvas): The canvas the Heatmap is drawn on
+        corner              (dict): The coordinates of the bottom left corner of the image
+        display_dimensions  (dict): The width and height of the image, and the width
+            of the color scale, in pixels
+        y_max               (numeric): The payoff time in years at the top of the color scale
+        image               (tk.PhotoImage): The rendered plane
+        balance             (numeric): The initial balance last rendered
+
+    Public methods:
+        update(balance)
+        show()
+        hide()
+        destroy()
+    """
+    def __init__(self, canvas=None, corner_x=0, corner_y=0, display_width=0, display_height=0,
+                 colorbar_width=12, y_max=30, label='APR vs. payment'):
+        if not canvas:
+            raise ValueError()
+        self.canvas = canvas
+        self.corner = {
+            'x': corner_x,
+            'y': corner_y}
+        self.display_dimensions = {
+            'width': display_width,
+            'height': display_height,
+            'colorbar_width': colorbar_width,
+            'colorbar_gap': 8}
+        self.y_max = y_max
+        self.balance = None
+
+        self.image = tk.PhotoImage(width=display_width, height=display_height)
+        colorbar = colorize(np.linspace(y_max, 0, display_height)[:, None], y_max)
+        self.colorbar_image = tk.PhotoImage(
+            data=to_ppm(np.repeat(colorbar, colorbar_width, axis=1)), format='PPM')
+        self.items = self._draw_on_canvas(label)
+
+    def update(self, balance):
+        """Renders the plane for a new initial balance"""
+        if balance == self.balance:
+            return
+        self.balance = balance
+        years = payoff_plane(balance)
+        rgb = colorize(resample(years, self.display_dimensions['width'],
+                                self.display_dimensions['height']), self.y_max)
+        self.image.configure(data=to_ppm(rgb), format='PPM')
+
+    def show(self):
+        for item in self.items:
+            self.canvas.itemconfigure(item, state=tk.NORMAL)
+
+    def hide(self):
+        for item in self.items:
+            self.canvas.itemconfigure(item, state=tk.HIDDEN)
+
+    def destroy(self):
+        """Deletes the items from the canvas and releases the images"""
+        for item in self.items:
+            self.canvas.delete(item)
+        self.items = []
+        self.image = self.colorbar_image = None
+
+    def _draw_on_canvas(self, label):
+        """Places the image, the color scale, and their labels on the canvas"""
+        width = self.display_dimensions['width']
+        height = self.display_dimensions['height']
+        colorbar_x = self.corner['x'] + width + self.display_dimensions['colorbar_gap']
+        top = self.corner['y'] - height
+        return [
+            self.canvas.create_image(self.corner['x'], top, image=self.image, anchor=tk.NW),
+            self.canvas.create_image(colorbar_x, top, image=self.colorbar_image, anchor=tk.NW),
+            self.canvas.create_text(self.corner['x'] + width / 2, top - 10, text=label),
+            self.canvas.create_text(
+                colorbar_x + self.display_dimensions['colorbar_width'], top,
+                text=str(self.y_max), anchor=tk.NW),
+            self.canvas.create_text(
+                colorbar_x + self.display_dimensions['colorbar_width'], self.corner['y'],
+                text='0 yr', anchor=tk.SW)]
+
+
+def payoff_plane(balance):
+    """Returns the payoff times in years of every cell of the rate x payment plane,
+    with the lowest rate in the last row so that the array reads like the image"""
+    rates = constants.interest_rate_axis().values()[::-1, None]
+    payments = constants.monthly_payment_axis().values()[None, :]
+    return payments_to_payoff_array(balance, rates / 12, payments) / 12
+
+
+def resample(values, width, height):
+    """Scales a 2-D array to width x height by nearest neighbour sampling"""
+    rows = (np.arange(height) * values.shape[0]) // height
+    columns = (np.arange(width) * values.shape[1]) // width
+    return values[rows[:, None], columns[None, :]]
+
+
+def colorize(years, y_max):
+    """Maps an array of payoff times to an RGB uint8 array of the same shape plus a
+    trailing color dimension. Times that are not finite or exceed y_max are grey."""
+    with np.errstate(invalid='ignore'):
+        position = np.clip(years / y_max, 0, 1) * (len(COLOR_STOPS) - 1)
+        off_scale = ~(years <= y_max)
+    position = np.where(off_scale, 0, position)
+    lower = np.minimum(np.floor(position).astype(np.intp), len(COLOR_STOPS) - 2)
+    fraction = (position - lower)[..., None]
+    rgb = COLOR_STOPS[lower] * (1 - fraction) + COLOR_STOPS[lower + 1] * fraction
+    rgb[off_scale] = NEVER_PAID_OFF_COLOR
+    return rgb.round().astype(np.uint8)
+
+
+def to_ppm(rgb):
+    """Encodes an RGB uint8 array of shape (height, width, 3) as binary PPM data"""
+    height, width = rgb.shape[:2]
+    return b'P6 %d %d 255\n' % (width, height) + np.ascontiguousarray(rgb).tobytes()
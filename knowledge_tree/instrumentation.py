@@ -0,0 +1,197 @@
+"""Named counters and timers for profiling Knowledge Tree.
+
+Instrumentation is off by default. While it is off every call returns after
+checking the module-level enabled flag, so the hooks can stay in the hot
+paths; callers that would have to do extra work to produce a value check
+instrumentation.enabled themselves first.
+
+Counters add up event counts. Distributions collect values such as
+durations, and keep the most recent MAX_SAMPLES of them for percentiles.
+snapshot() returns everything as plain data, export() writes it as JSON,
+and Overlay shows it on a canvas while the program runs.
+
+Set the KNOWLEDGE_TREE_INSTRUMENT environment variable to switch it on, with
+an overlay, when the program starts. If it names a .json file, the final
+snapshot is exported there when the program exits.
+"""
+import json
+import threading
+import time
+import tkinter as tk
+
+import numpy as np
+
+
+ENVIRONMENT_VARIABLE = 'KNOWLEDGE_TREE_INSTRUMENT'
+MAX_SAMPLES = 1024      # recent values kept per distribution for percentiles
+PERCENTILES = (50, 90, 99)
+
+enabled = False
+_lock = threading.Lock()
+_counters = {}
+_distributions = {}
+
+
+class Distribution(object):
+    """Summary statistics of the values observed under one name
+
+    Attributes:
+        count   (int): The number of values observed
+        total   (float): Their sum
+        min     (float): The smallest value
+        max     (float): The largest value
+        samples (list): The most recent MAX_SAMPLES values, as a ring buffer
+    """
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+        self.samples = []
+
+    def add(self, value):
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(value)
+        else:
+            self.samples[self.count % MAX_SAMPLES] = value
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def summary(self):
+        """Returns the statistics as a dict, with percentiles of the recent samples"""
+        summary = {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'min': self.min if self.count else 0.0,
+            'max': self.max if self.count else 0.0}
+        for percentile, value in zip(PERCENTILES, np.percentile(self.samples or [0], PERCENTILES)):
+            summary['p{}'.format(percentile)] = float(value)
+        return summary
+
+
+class _Timer(object):
+    """Context manager adding the time spent in its block to a distribution"""
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer(object):
+    """Context manager that does nothing, shared by every timer while disabled"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    """Forgets every counter and distribution"""
+    with _lock:
+        _counters.clear()
+        _distributions.clear()
+
+
+def count(name, n=1):
+    """Adds n to the counter name"""
+    if not enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def observe(name, value):
+    """Adds a value to the distribution name"""
+    if not enabled:
+        return
+    with _lock:
+        distribution = _distributions.get(name)
+        if distribution is None:
+            distribution = _distributions[name] = Distribution()
+        distribution.add(value)
+
+
+def timer(name):
+    """Returns a context manager that observes the seconds spent in its block under name"""
+    if not enabled:
+        return _NULL_TIMER
+    return _Timer(name)
+
+
+def snapshot():
+    """Returns the current counters, and the summary of each distribution, as a dict"""
+    with _lock:
+        return {
+            'counters': dict(_counters),
+            'distributions': {name: distribution.summary()
+                              for name, distribution in _distributions.items()}}
+
+
+def export(path):
+    """Writes snapshot() to path as JSON"""
+    with open(path, 'w') as f:
+        json.dump(snapshot(), f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def format_snapshot(data):
+    """Formats a snapshot as lines of text, distributions of seconds in milliseconds"""
+    lines = ['{0}: {1:,}'.format(name, value) for name, value in sorted(data['counters'].items())]
+    for name, summary in sorted(data['distributions'].items()):
+        if name.endswith('_seconds'):
+            lines.append('{0}: n={1:,} p50={2:.1f}ms p99={3:.1f}ms'.format(
+                name[:-len('_seconds')], summary['count'], summary['p50'] * 1000,
+                summary['p99'] * 1000))
+        else:
+            lines.append('{0}: n={1:,} p50={2:g} max={3:g}'.format(
+                name, summary['count'], summary['p50'], summary['max']))
+    return lines
+
+
+class Overlay(object):
+    """Shows the current snapshot as text in a corner of a canvas, refreshed on a timer
+
+    Public methods:
+        Overlay(canvas, x=10, y=10, interval_ms=500)
+        refresh()
+        stop()
+    """
+    def __init__(self, canvas, x=10, y=10, interval_ms=500):
+        self.canvas = canvas
+        self.interval_ms = interval_ms
+        self.item = canvas.create_text(x, y, anchor=tk.NW, font=('Courier', 8), fill='#555555')
+        self._after_id = None
+        self.refresh()
+
+    def refresh(self):
+        """Redraws the text and schedules the next refresh"""
+        self.canvas.itemconfigure(self.item, text='\n'.join(format_snapshot(snapshot())))
+        self._after_id = self.canvas.after(self.interval_ms, self.refresh)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.canvas.after_cancel(self._after_id)
+            self._after_id = None
@@ -0,0 +1,117 @@
+"""Payoff times between the cells of a stored grid"""
+from itertools import product
+
+import numpy as np
+
+
+def interpolate_payoff_times(table, Bo, r, p, log_space=False):
+    """Estimates payoff times at any (Bo, r, p) inside a PayoffTable by trilinear
+    interpolation of the eight surrounding cells.
+
+    The arguments may be scalars or array-likes of any shape that broadcast
+    against each other, and every query point is answered in one vectorized pass.
+
+    Near the boundary where a payment no longer covers the interest
+    (1 - i*a/p <= 0), payoff times grow like -log(1 - i*a/p) and some of the
+    surrounding cells are never paid off. In log space the cells are
+    interpolated as u = (1 + i)**-t, with i the monthly rate of the query.
+    u is close to linear in the inputs and falls to 0 at the boundary, so
+    the estimate stays finite on the paid off side of it, though its error
+    bound is inf. Otherwise any surrounding cell that is never paid off makes
+    the estimate inf.
+
+    The error bound of each estimate is the usual bound for linear
+    interpolation, w(1 - w)/2 times the second difference along each axis,
+    summed over the axes. Second differences are taken from the stored
+    cells at both ends of the query's cell, so the bound is an estimate
+    rather than a guarantee. Cells at the end of an axis reuse the second
+    difference one step in, which underestimates the error where payoff
+    times curve more sharply toward the end (the smallest payments), and
+    axes with fewer than three values contribute nothing.
+
+    Args:
+        table (PayoffTable): The stored grid, with times in months
+        Bo: The initial balance(s)
+        r: The interest rate(s) per year
+        p: The monthly payment(s)
+        log_space (bool): Interpolate (1 + i)**-t instead of t
+
+    Returns:
+        (times, error_bounds), float ndarrays of the broadcast shape in months.
+        Queries outside the range of the table hold nan in both.
+    """
+    Bo, r, p = np.broadcast_arrays(
+        np.asarray(Bo, dtype=float),
+        np.asarray(r, dtype=float),
+        np.asarray(p, dtype=float))
+    axes = (table.balances, table.rates, table.payments)
+    lower, weight, inside = zip(*(_locate(axis, values) for axis, values in zip(axes, (Bo, r, p))))
+    scale = np.log1p(r / 12) if log_space else np.zeros(r.shape)
+
+    def cells(index):
+        """Gathers and transforms the stored times at an index tuple"""
+        with np.errstate(invalid='ignore', over='ignore'):
+            t = np.asarray(table.times[index], dtype=float)
+            return np.where(scale > 0, np.exp(-scale * t), t)
+
+    estimate = np.zeros(Bo.shape)
+    unpaid_corner = np.zeros(Bo.shape, dtype=bool)
+    for corner in product((0, 1), repeat=3):
+        index = tuple(lower[k] + corner[k] * (len(axes[k]) > 1) for k in range(3))
+        w = np.prod([weight[k] if corner[k] else 1 - weight[k] for k in range(3)], axis=0)
+        unpaid_corner |= (w > 0) & ~np.isfinite(table.times[index])
+        with np.errstate(invalid='ignore'):
+            estimate += np.where(w == 0, 0, w * cells(index))
+
+    bound = np.zeros(Bo.shape)
+    for k, axis in enumerate(axes):
+        if len(axis) < 3:
+            continue
+        curvature = np.zeros(Bo.shape)
+        others = [j for j in range(3) if j != k]
+        for corner in product((0, 1), repeat=3):
+            # Second differences centred on both ends of the cell, along each of its four edges
+            centre = np.clip(lower[k] + corner[2], 1, len(axis) - 2)
+            edge = [None] * 3
+            for j, c in zip(others, corner[:2]):
+                edge[j] = lower[j] + c * (len(axes[j]) > 1)
+            around = []
+            for offset in (-1, 0, 1):
+                edge[k] = centre + offset
+                around.append(cells(tuple(edge)))
+            with np.errstate(invalid='ignore'):
+                second_difference = np.abs(around[0] - 2 * around[1] + around[2])
+            curvature = np.maximum(curvature, np.where(np.isnan(second_difference), np.inf,
+                                                       second_difference))
+        spread = weight[k] * (1 - weight[k]) / 2
+        with np.errstate(invalid='ignore'):
+            bound += np.where(spread == 0, 0, spread * curvature)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        safe_scale = np.where(scale > 0, scale, 1)
+        times = np.where(scale > 0,
+                         np.where(estimate > 0, -np.log(estimate) / safe_scale, np.inf),
+                         estimate)
+        # -log is convex, so the far side of the bound in u is the larger error in t
+        bound = np.where(scale > 0,
+                         np.where(estimate - bound > 0,
+                                  -np.log(estimate - bound) / safe_scale - times, np.inf),
+                         bound)
+    # u is clipped to 0 past the boundary, which the second differences do
+    # not see, so estimates next to an unpaid cell come without a bound
+    bound[unpaid_corner] = np.inf
+
+    outside = ~(inside[0] & inside[1] & inside[2])
+    times[outside] = np.nan
+    bound[outside] = np.nan
+    return times, bound
+
+
+def _locate(axis, values):
+    """Returns the index of the cell below each value on the axis, the fraction
+    of a step each value lies above it, and whether each value is on the axis"""
+    steps = (values - axis.min) / axis.step
+    inside = (steps >= -axis.TOLERANCE) & (steps <= len(axis) - 1 + axis.TOLERANCE)
+    steps = np.clip(np.nan_to_num(steps), 0, len(axis) - 1)
+    lower = np.minimum(np.floor(steps), max(len(axis) - 2, 0)).astype(np.intp)
+    return lower, steps - lower, inside
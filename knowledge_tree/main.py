@@ -1,29 +1,101 @@
+import time
+STARTED = time.perf_counter()   # before the other imports, so the startup trace includes them
+
+import os
 import tkinter as tk
 
-from knowledge_tree.view import View
-from knowledge_tree.controller import Controller
+import knowledge_tree.startup as startup
 
 
 class Main(object):
     """Manages the communication between the Model, View, and Controller instances
-    
+
     Attributes:
         root (tk.Tk): Root window
         model (Model)
-        view (View)
-        controller (Controller)
-        
+        view (View): None until it has been loaded
+        controller (Controller): None until it has been loaded
+        overlay (instrumentation.Overlay): Shown when instrumentation is switched on
+            by the KNOWLEDGE_TREE_INSTRUMENT environment variable, otherwise None.
+            If the variable names a .json file the final snapshot is written to it.
+        trace (StartupTrace): How long each phase of startup took
+
     Public methods:
+        Main(progressive=True)
         main()
+
+    With progressive startup the window is shown first, and the View, its
+    empty axes, and the Controller are loaded in later turns of the event
+    loop, importing numpy and the rest of the program as they go. The
+    default curve is computed on the curve worker and drawn when it is
+    ready. Otherwise everything, including the default curve, is loaded
+    before Main() returns.
     """
-    def __init__(self):
+    def __init__(self, progressive=True):
+        self.trace = startup.StartupTrace(start=STARTED)
+        self.trace.mark('imports')
         self.root = tk.Tk()
-        self.view = View(main=self)
-        self.controller = Controller(main=self)
-        
+        self.view = None
+        self.controller = None
+        self.overlay = None
+        self.trace.mark('tk_root')
+
+        if progressive:
+            # Each stage runs in its own turn of the event loop, so the window
+            # is drawn and kept responsive in between
+            self.root.after_idle(self._load_view)
+        else:
+            from knowledge_tree.view import View
+            from knowledge_tree.controller import Controller
+            self.trace.mark('view_imports')
+            self.view = View(main=self)
+            self.trace.mark('view')
+            self.controller = Controller(main=self)
+            self._instrument()
+            self.trace.mark('controller')
+            self._finish_startup()
+
     def main(self):
         self.root.mainloop()
-        
-        
+        from knowledge_tree import instrumentation
+        path = os.environ.get(instrumentation.ENVIRONMENT_VARIABLE, '')
+        if path.endswith('.json'):
+            instrumentation.export(path)
+
+    def _load_view(self):
+        """Shows the axes, without a curve"""
+        from knowledge_tree.view import View
+        self.trace.mark('view_imports')
+        self.view = View(main=self, plot_curve=False)
+        self.trace.mark('view')
+        self.root.after_idle(self._load_controller)
+
+    def _load_controller(self):
+        """Adds the controls, and requests the default curve from the curve worker"""
+        import knowledge_tree.constants as constants
+        from knowledge_tree.controller import Controller
+        self.controller = Controller(main=self)
+        self._instrument()
+        self.trace.mark('controller')
+        self.controller.on_first_curve = self._finish_startup
+        self.controller.scheduler.request(
+            constants.initial_balance['default'], constants.interest_rate['default'])
+
+    def _instrument(self):
+        from knowledge_tree import instrumentation
+        if os.environ.get(instrumentation.ENVIRONMENT_VARIABLE):
+            instrumentation.enable()
+            self.overlay = instrumentation.Overlay(self.view.canvas)
+
+    def _finish_startup(self):
+        """Ends the trace once the default curve is on screen, and reports it"""
+        from knowledge_tree import instrumentation
+        self.trace.mark('curve')
+        for phase, seconds in self.trace.phases:
+            instrumentation.observe('startup.{}_seconds'.format(phase), seconds)
+        if os.environ.get(startup.ENVIRONMENT_VARIABLE):
+            print('\n'.join(self.trace.format()))
+
+
 if __name__ == '__main__':
     Main().main()
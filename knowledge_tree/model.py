@@ -1,8 +1,13 @@
-import math
+from itertools import islice
+
+import numpy as np
 
 import knowledge_tree.constants as constants
 import knowledge_tree.database as database
-from knowledge_tree.financial_tools import time_until_zero_balance
+from knowledge_tree import instrumentation
+from knowledge_tree.financial_tools import payments_to_payoff_array
+from knowledge_tree.interpolation import interpolate_payoff_times
+from knowledge_tree.payoff_table import PayoffTable
 
 
 class Model(object):
@@ -16,78 +21,150 @@ class Model(object):
             to the interest_rate_slider in the Controller instance.
         initial_balance (int): The current initial balance being displayed. This value will
             be matched to the initial_balance_slider in the Controller instance.
-        payoff_times (dict<initial balance, dict<interest rate, dict<payment, payoff time>>>):
-            A nested dictionary structure containing the data to be plotted.
+        payoff_times (PayoffTable): The data to be plotted, once it has been loaded
+        grid_store (GridStore): An optional memory-mapped grid of payoff times. When it
+            is set, queries are answered from it instead of the database.
+        curve_cache (CurveCache): An optional cache of the results of
+            get_time_vs_payment_data. It should not snap, so that off-grid
+            queries fail the same way with or without it.
             
     Public methods:
-        Model(main=None)
-        calculate_payoff_times()
-        delete_payoff_times_from_database()
-        load_payoff_times()
+        Model(main=None, db=None, grid_store=None, curve_cache=None)
+        payoff_rows()
+        calculate_payoff_times(batch_size=database.DEFAULT_BATCH_SIZE,
+            commit_interval=database.DEFAULT_COMMIT_INTERVAL, report=None)
+        delete_payoff_times_from_database(chunk_size=database.DEFAULT_PURGE_CHUNK_SIZE,
+            truncate=False, reclaim_space=False)
+        load_payoff_times(chunk_size=100000)
         get_time_vs_payment_data(Bo=0, r=0)
-        get_payoff_time(Bo=0, r=0, p=0)
+        get_payoff_time(Bo=0, r=0, p=0, interpolate=False, log_space=False)
+        interpolate_payoff_times(Bo, r, p, log_space=False)
     """
-    def __init__(self, main=None, db=None):    
+    def __init__(self, main=None, db=None, grid_store=None, curve_cache=None):    
         self.main = main
         self.database = db
         self.interest_rate = constants.interest_rate['default']
         self.initial_balance = constants.initial_balance['default']
-        self.payoff_times = dict()
+        self.payoff_times = None
+        self.grid_store = grid_store
+        self.curve_cache = curve_cache
     
-    def calculate_payoff_times(self):
-        """Calculates payoff time data and stores the results in the database"""
-        with self.database.transaction():
-            current_id = 0
-            for Bo in constants.initial_balance_range():
-                for r in constants.interest_rate_range():
-                    for p in constants.monthly_payment_range():
-                        print("Calculating for initial balance {0}, rate {1}, monthly payment {2}".format(Bo, r, p))
-                        t = time_until_zero_balance(r, Bo, p)
-                        if t is not None:
-                            database.create_point(current_id, Bo, r, p, t)
-                        current_id += 1
-                                
-    def delete_payoff_times_from_database(self):
+    @staticmethod
+    def payoff_rows():
+        """Generator function returning an iterator to the (Bo, r, p, t) rows to store.
+
+        Payoff times are calculated one initial balance at a time over the whole
+        rate x payment plane. Cells that are never paid off are skipped.
+        """
+        rates = constants.interest_rate_axis().values()
+        payments = constants.monthly_payment_axis().values()
+        r_grid, p_grid = np.meshgrid(rates, payments, indexing='ij')
+
+        for Bo in constants.initial_balance_range():
+            t = payments_to_payoff_array(Bo, r_grid / 12, p_grid)
+            finite = np.isfinite(t)
+            yield from zip([Bo] * int(finite.sum()), r_grid[finite].tolist(),
+                           p_grid[finite].tolist(), t[finite].tolist())
+
+    def calculate_payoff_times(self, batch_size=database.DEFAULT_BATCH_SIZE,
+                               commit_interval=database.DEFAULT_COMMIT_INTERVAL, report=None):
+        """Calculates payoff time data and streams the results into the database
+
+        Args:
+            report (function): Called with the database.IngestStats after each commit
+
+        Returns:
+            The database.IngestStats of the insert
+        """
+        with instrumentation.timer('model.calculate_payoff_times_seconds'):
+            return database.bulk_insert_points(
+                self.payoff_rows(), batch_size=batch_size, commit_interval=commit_interval,
+                report=report)
+
+    def delete_payoff_times_from_database(self, chunk_size=database.DEFAULT_PURGE_CHUNK_SIZE,
+                                          truncate=False, reclaim_space=False):
         """Generator function returning an iterator that deletes ALL of the data from the database.
         
-        After each data point is deleted, the iterator yields the percent done with the process.
+        Data points are deleted a range of keys at a time (or all at once with truncate).
+        After each range is deleted, the iterator yields the percent done with the process.
+        See database.purge_points for the arguments.
         """
-        with self.database.transaction():
-            points = database.DataPoint.select()
-            num_points = points.count()
-            i = 0
-            for point in points:
-                (Bo, r, p, t) = (point.Bo, point.r, point.p, point.t)
-                print("Deleting point with (Bo, r, p, t) = ({0}, {1}, {2}, {3})".format(Bo, r, p, t)) 
-                
-                point.delete_instance()
-                
-                percent_done = math.floor(100 * i / num_points)
-                yield percent_done
-                i += 1
+        yield from database.purge_points(
+            chunk_size=chunk_size, truncate=truncate, reclaim_space=reclaim_space)
     
-    def load_payoff_times(self):
-        """Gets all of the data points from the database and loads them into memory as
-        elements of the self.payoff_times dictionary"""
-        with self.database.transaction():
-            data = database.DataPoint.select()
-            for point in data:
-                Bo, r, p, t = point.Bo, point.r, point.p, point.t
-                self.payoff_times[Bo] = self.payoff_times.get(Bo, {})
-                self.payoff_times[Bo][r] = self.payoff_times[Bo].get(r, {})
-                self.payoff_times[Bo][r][p] = t
+    def load_payoff_times(self, chunk_size=100000):
+        """Loads all of the data points into memory as the self.payoff_times PayoffTable.
 
-    @staticmethod
-    def get_time_vs_payment_data(Bo=0, r=0):
+        When a grid store is set the table is a view of its memory-mapped array.
+        Otherwise the points are read from the database chunk_size rows at a time.
+
+        Returns:
+            The loaded PayoffTable
+        """
+        if self.grid_store is not None:
+            self.payoff_times = self.grid_store.as_table()
+            return self.payoff_times
+
+        with instrumentation.timer('model.load_payoff_times_seconds'), \
+                self.database.transaction():
+            rows = (database.DataPoint
+                    .select(database.DataPoint.Bo, database.DataPoint.r,
+                            database.DataPoint.p, database.DataPoint.t)
+                    .tuples()
+                    .iterator())
+            chunks = iter(lambda: list(islice(rows, chunk_size)), [])
+            self.payoff_times = PayoffTable.from_rows(
+                chunks, constants.initial_balance_axis(), constants.interest_rate_axis(),
+                constants.monthly_payment_axis())
+        return self.payoff_times
+
+    def get_time_vs_payment_data(self, Bo=0, r=0):
         """Gets the time vs. payment data for given values of Bo and r.
         """
+        if self.curve_cache is not None:
+            axes = None
+            if self.grid_store is not None:
+                axes = (self.grid_store.axes['Bo'], self.grid_store.axes['r'])
+            return self.curve_cache.get(Bo, r, self._fetch_time_vs_payment_data, axes)
+        return self._fetch_time_vs_payment_data(Bo, r)
+
+    def _fetch_time_vs_payment_data(self, Bo, r):
+        if self.grid_store is not None:
+            return self.grid_store.get_time_vs_payment_data(Bo, r)
         return database.get_time_vs_payment_data(Bo, r)
 
-    @staticmethod
-    def get_payoff_time(Bo=0, r=0, p=0):
-        """Gets the payoff time for given values of Bo, r, and p."""
+    def get_payoff_time(self, Bo=0, r=0, p=0, interpolate=False, log_space=False):
+        """Gets the payoff time for given values of Bo, r, and p.
+
+        With interpolate the values may lie between the cells of the loaded
+        table or grid store. See interpolate_payoff_times.
+        """
+        if interpolate:
+            t, _ = self.interpolate_payoff_times(Bo, r, p, log_space=log_space)
+            if not np.isfinite(t):
+                raise ValueError("Bo={}, r={}, p={} is never paid off or off the grid".format(Bo, r, p))
+            return float(t)
         try:
-            print("In model,", database.get_payoff_time(Bo, r, p))
+            if self.grid_store is not None:
+                return self.grid_store.get_payoff_time(Bo, r, p)
             return database.get_payoff_time(Bo, r, p)
         except ValueError:
             raise ValueError("No DataPoint was found with Bo={}, r={}, p={}".format(Bo, r, p))
+
+    def interpolate_payoff_times(self, Bo, r, p, log_space=False):
+        """Estimates the payoff times of any number of (Bo, r, p) points between
+        the cells of the loaded table, or of the grid store if none is loaded.
+
+        Returns:
+            (times, error_bounds) arrays. See interpolation.interpolate_payoff_times.
+
+        Raises:
+            ValueError: Raised if there is neither a loaded table nor a grid store
+        """
+        table = self.payoff_times
+        if table is None and self.grid_store is not None:
+            # Only the cells around the query points are decoded
+            table = self.grid_store.as_table(lazy=True)
+        if table is None:
+            raise ValueError("Payoff times must be loaded to interpolate between them")
+        return interpolate_payoff_times(table, Bo, r, p, log_space=log_space)
@@ -0,0 +1,418 @@
+"""Headless drawing backend for Axes and View.
+
+Axes and View only use a small part of the tk.Canvas interface: creating
+lines, ovals, rectangles, and text, changing their coordinates and options,
+bindings, and idle callbacks. OffscreenCanvas provides that same interface
+without a display. It records the items drawn on it, and exports them as SVG
+or rasterizes them to PNG in-process, so charts can be drawn on build
+servers and in batch jobs exactly as they are drawn in the window.
+
+Usage:
+    python -m knowledge_tree.offscreen OUTPUT_DIR [--format {svg,png}] BALANCE,APR [BALANCE,APR ...]
+"""
+import argparse
+import os
+import struct
+import time
+import zlib
+from collections import OrderedDict
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+
+import knowledge_tree.constants as constants
+from knowledge_tree.view import View
+
+
+NAMED_COLORS = {
+    'black': (0, 0, 0),
+    'white': (255, 255, 255),
+    'red': (255, 0, 0),
+    'green': (0, 128, 0),
+    'blue': (0, 0, 255),
+    'grey': (190, 190, 190),
+    'gray': (190, 190, 190)}
+# Default options of each kind of item, as on a tk.Canvas
+DEFAULT_OPTIONS = {
+    'line': {'fill': 'black', 'width': 1},
+    'oval': {'fill': '', 'outline': 'black', 'width': 1},
+    'rectangle': {'fill': '', 'outline': 'black', 'width': 1},
+    'text': {'fill': 'black', 'text': '', 'anchor': 'center'}}
+# Approximate size in pixels of a character of the default font, for bbox
+CHARACTER_WIDTH = 6
+LINE_HEIGHT = 13
+
+
+class OffscreenCanvas(object):
+    """Stands in for tk.Canvas without a display, recording the items drawn on it.
+
+    Items are kept in stacking order. Callbacks passed to after_idle and after
+    are queued and run by update_idletasks and update; there is no event loop.
+
+    Attributes:
+        width, height   (int): The size of the canvas in pixels
+        background      (str): The background color
+        items           (OrderedDict): [kind, coords, options] for each item,
+            keyed by reference, from the bottom of the stack to the top
+        bindings        (dict): The callback bound to each event sequence
+
+    Public methods:
+        OffscreenCanvas(width=None, height=None, background='#FFFFFF')
+        create_line(*coords, **options)
+        create_oval(*coords, **options)
+        create_rectangle(*coords, **options)
+        create_text(*coords, **options)
+        coords(reference, *coords)
+        itemconfigure(reference, **options)
+        itemcget(reference, option)
+        type(reference)
+        find_all()
+        bbox(reference)
+        tag_raise(reference)
+        delete(reference)
+        bind(sequence, callback)
+        after_idle(callback)
+        after(delay_ms, callback)
+        after_cancel(identifier)
+        update_idletasks()
+        update()
+        to_svg()
+        rasterize()
+        to_png()
+        save(path)
+    """
+    def __init__(self, width=None, height=None, background='#FFFFFF'):
+        self.width = width if width is not None else constants.canvas_dimensions['width']
+        self.height = height if height is not None else constants.canvas_dimensions['height']
+        self.background = background
+        self.items = OrderedDict()
+        self.bindings = {}
+        self._next_reference = 1
+        self._idle_callbacks = OrderedDict()
+        self._timers = OrderedDict()
+        self._next_callback = 1
+
+    def _create(self, kind, coords, options):
+        if len(coords) == 1:
+            coords = coords[0]
+        reference = self._next_reference
+        self._next_reference += 1
+        item_options = dict(DEFAULT_OPTIONS[kind])
+        item_options.update(options)
+        self.items[reference] = [kind, [float(c) for c in coords], item_options]
+        return reference
+
+    def create_line(self, *coords, **options):
+        return self._create('line', coords, options)
+
+    def create_oval(self, *coords, **options):
+        return self._create('oval', coords, options)
+
+    def create_rectangle(self, *coords, **options):
+        return self._create('rectangle', coords, options)
+
+    def create_text(self, *coords, **options):
+        return self._create('text', coords, options)
+
+    def coords(self, reference, *coords):
+        if len(coords) == 1:
+            coords = coords[0]
+        if coords:
+            self.items[reference][1] = [float(c) for c in coords]
+        return list(self.items[reference][1])
+
+    def itemconfigure(self, reference, **options):
+        self.items[reference][2].update(options)
+
+    itemconfig = itemconfigure
+
+    def itemcget(self, reference, option):
+        return self.items[reference][2].get(option, '')
+
+    def type(self, reference):
+        return self.items[reference][0]
+
+    def find_all(self):
+        return tuple(self.items)
+
+    def bbox(self, reference):
+        """Returns the bounding box of an item. Text is measured with a fixed
+        character size, as there are no fonts."""
+        kind, coords, options = self.items[reference]
+        if kind == 'text':
+            lines = str(options.get('text', '')).split('\n')
+            width = CHARACTER_WIDTH * max(len(line) for line in lines)
+            height = LINE_HEIGHT * len(lines)
+            left, top = _anchor_offset(options.get('anchor', 'center'), width, height)
+            x, y = coords[0] + left, coords[1] + top
+            return int(x), int(y), int(x + width), int(y + height)
+        xs, ys = coords[0::2], coords[1::2]
+        return int(min(xs)), int(min(ys)), int(max(xs)), int(max(ys))
+
+    def tag_raise(self, reference):
+        self.items.move_to_end(reference)
+
+    def delete(self, reference):
+        self.items.pop(reference, None)
+
+    def bind(self, sequence, callback):
+        self.bindings[sequence] = callback
+
+    def after_idle(self, callback, *args):
+        identifier = self._callback_id()
+        self._idle_callbacks[identifier] = (callback, args)
+        return identifier
+
+    def after(self, delay_ms, callback, *args):
+        identifier = self._callback_id()
+        self._timers[identifier] = (time.perf_counter() + delay_ms / 1000, callback, args)
+        return identifier
+
+    def after_cancel(self, identifier):
+        self._idle_callbacks.pop(identifier, None)
+        self._timers.pop(identifier, None)
+
+    def update_idletasks(self):
+        """Runs the idle callbacks queued so far. Callbacks they queue wait for the next call."""
+        callbacks, self._idle_callbacks = self._idle_callbacks, OrderedDict()
+        for callback, args in callbacks.values():
+            callback(*args)
+
+    def update(self):
+        """Runs the timers that are due, then the idle callbacks"""
+        now = time.perf_counter()
+        for identifier, (due, callback, args) in list(self._timers.items()):
+            if due <= now and self._timers.pop(identifier, None) is not None:
+                callback(*args)
+        self.update_idletasks()
+
+    def _callback_id(self):
+        identifier = 'offscreen#{}'.format(self._next_callback)
+        self._next_callback += 1
+        return identifier
+
+    def _visible_items(self):
+        for reference, (kind, coords, options) in self.items.items():
+            if options.get('state', 'normal') != 'hidden':
+                yield kind, coords, options
+
+    def to_svg(self):
+        """Returns the visible items as an SVG document"""
+        elements = [
+            '<svg xmlns="http://www.w3.org/2000/svg" width="{0}" height="{1}" '
+            'viewBox="0 0 {0} {1}">'.format(self.width, self.height),
+            '<defs><marker id="arrow" markerWidth="8" markerHeight="6" refX="8" refY="3" '
+            'orient="auto"><path d="M0,0 L8,3 L0,6 z"/></marker></defs>',
+            '<rect width="100%" height="100%" fill={}/>'.format(quoteattr(self.background))]
+        for kind, coords, options in self._visible_items():
+            elements.append(_svg_element(kind, coords, options))
+        elements.append('</svg>')
+        return '\n'.join(elements) + '\n'
+
+    def rasterize(self):
+        """Draws the visible items into an RGB uint8 array of shape (height, width, 3).
+
+        Lines, ovals, and rectangles are drawn without antialiasing. Text is
+        left out, as there are no fonts; export SVG for labelled charts.
+        """
+        image = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        image[:] = _parse_color(self.background)
+        for kind, coords, options in self._visible_items():
+            width = max(int(round(float(options.get('width', 1)))), 1)
+            if kind == 'line':
+                _plot(image, *_polyline_pixels(coords), options.get('fill'), width)
+            elif kind == 'rectangle':
+                x0, y0, x1, y1 = coords[:4]
+                _fill_rectangle(image, x0, y0, x1, y1, options.get('fill'))
+                corners = [x0, y0, x1, y0, x1, y1, x0, y1, x0, y0]
+                _plot(image, *_polyline_pixels(corners), options.get('outline'), width)
+            elif kind == 'oval':
+                _draw_oval(image, coords[:4], options.get('fill'), options.get('outline'), width)
+        return image
+
+    def to_png(self):
+        """Returns the rasterized canvas encoded as PNG data"""
+        return encode_png(self.rasterize())
+
+    def save(self, path):
+        """Writes the canvas to path as SVG or PNG, by the extension of path"""
+        if path.lower().endswith('.png'):
+            data = self.to_png()
+        elif path.lower().endswith('.svg'):
+            data = self.to_svg().encode('utf-8')
+        else:
+            raise ValueError("Cannot tell the image format of {}".format(path))
+        with open(path, 'wb') as f:
+            f.write(data)
+
+
+def render_scenarios(scenarios, directory, image_format='svg', report=None):
+    """Draws the payoff time vs. payment chart of each scenario to an image file.
+
+    One View and canvas are reused for every chart, so each chart only costs
+    the changes from the one before it.
+
+    Args:
+        scenarios (iterable): (initial balance, APR) pairs
+        directory (str): The directory to write the charts to, as
+            chart_<balance>_<APR>.<image_format>, with each value written out in
+            full so that distinct scenarios never share a file
+        image_format (str): 'svg' or 'png'
+        report (function): Called with the number of charts written after each chart
+    Returns:
+        The paths of the files written
+    """
+    canvas = OffscreenCanvas()
+    view = View(canvas=canvas)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for balance, rate in scenarios:
+        view.update_axes(balance, rate)
+        canvas.update_idletasks()
+        path = os.path.join(directory, 'chart_{0}_{1}.{2}'.format(
+            _file_number(balance), _file_number(rate), image_format))
+        canvas.save(path)
+        paths.append(path)
+        if report is not None:
+            report(len(paths))
+    return paths
+
+
+def encode_png(rgb):
+    """Encodes an RGB uint8 array of shape (height, width, 3) as PNG data"""
+    height, width = rgb.shape[:2]
+    rows = np.concatenate(
+        (np.zeros((height, 1), dtype=np.uint8), np.ascontiguousarray(rgb).reshape(height, width * 3)),
+        axis=1)
+
+    def chunk(tag, data):
+        return (struct.pack('>I', len(data)) + tag + data +
+                struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+
+    return (b'\x89PNG\r\n\x1a\n' +
+            chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)) +
+            chunk(b'IDAT', zlib.compress(rows.tobytes(), 6)) +
+            chunk(b'IEND', b''))
+
+
+def _file_number(value):
+    """Returns the shortest text that round-trips value, without a trailing .0"""
+    text = repr(float(value))
+    return text[:-2] if text.endswith('.0') else text
+
+
+def _parse_color(color):
+    """Returns the (r, g, b) of a tk color name or #RRGGBB string, or None for no color"""
+    if not color:
+        return None
+    if color.startswith('#') and len(color) == 7:
+        return tuple(int(color[k:k + 2], 16) for k in (1, 3, 5))
+    return NAMED_COLORS.get(color.lower(), (0, 0, 0))
+
+
+def _anchor_offset(anchor, width, height):
+    """Returns the offset from the anchor point to the top left of a box"""
+    anchor = str(anchor)
+    left = 0 if 'w' in anchor else -width if 'e' in anchor else -width / 2
+    top = 0 if 'n' in anchor else -height if 's' in anchor else -height / 2
+    return left, top
+
+
+def _svg_element(kind, coords, options):
+    if kind == 'line':
+        points = ' '.join('{0:g},{1:g}'.format(x, y) for x, y in zip(coords[0::2], coords[1::2]))
+        arrow = ' marker-end="url(#arrow)"' if options.get('arrow') in ('last', 'both') else ''
+        return '<polyline points="{0}" fill="none" stroke={1} stroke-width="{2}"{3}/>'.format(
+            points, quoteattr(options.get('fill') or 'none'), options.get('width', 1), arrow)
+    if kind in ('rectangle', 'oval'):
+        x0, y0, x1, y1 = coords[:4]
+        paint = 'fill={0} stroke={1} stroke-width="{2}"'.format(
+            quoteattr(options.get('fill') or 'none'), quoteattr(options.get('outline') or 'none'),
+            options.get('width', 1))
+        if kind == 'rectangle':
+            return '<rect x="{0:g}" y="{1:g}" width="{2:g}" height="{3:g}" {4}/>'.format(
+                min(x0, x1), min(y0, y1), abs(x1 - x0), abs(y1 - y0), paint)
+        return '<ellipse cx="{0:g}" cy="{1:g}" rx="{2:g}" ry="{3:g}" {4}/>'.format(
+            (x0 + x1) / 2, (y0 + y1) / 2, abs(x1 - x0) / 2, abs(y1 - y0) / 2, paint)
+    anchor = str(options.get('anchor', 'center'))
+    text_anchor = 'start' if 'w' in anchor else 'end' if 'e' in anchor else 'middle'
+    baseline = 'hanging' if 'n' in anchor else 'text-after-edge' if 's' in anchor else 'central'
+    return ('<text x="{0:g}" y="{1:g}" fill={2} font-family="sans-serif" font-size="11" '
+            'text-anchor="{3}" dominant-baseline="{4}">{5}</text>').format(
+        coords[0], coords[1], quoteattr(options.get('fill') or 'black'), text_anchor, baseline,
+        escape(str(options.get('text', ''))))
+
+
+def _polyline_pixels(coords):
+    """Returns the x and y arrays of the pixels along each segment of a polyline"""
+    xs, ys = np.asarray(coords[0::2], dtype=float), np.asarray(coords[1::2], dtype=float)
+    if len(xs) < 2:
+        return xs.astype(np.intp), ys.astype(np.intp)
+    steps = np.maximum(np.ceil(np.maximum(np.abs(np.diff(xs)), np.abs(np.diff(ys)))), 1).astype(np.intp)
+    segment = np.repeat(np.arange(len(steps)), steps + 1)
+    fraction = (np.arange(len(segment)) - np.repeat(np.cumsum(steps + 1) - steps - 1, steps + 1)) / steps[segment]
+    pixel_x = xs[segment] + (xs[segment + 1] - xs[segment]) * fraction
+    pixel_y = ys[segment] + (ys[segment + 1] - ys[segment]) * fraction
+    return np.rint(pixel_x).astype(np.intp), np.rint(pixel_y).astype(np.intp)
+
+
+def _plot(image, xs, ys, color, width=1):
+    """Sets the pixels at xs, ys, thickened to width, that fall on the image"""
+    color = _parse_color(color)
+    if color is None or len(xs) == 0:
+        return
+    if width > 1:
+        offsets = np.arange(width) - (width - 1) // 2
+        dx, dy = np.meshgrid(offsets, offsets)
+        xs = (xs[:, None] + dx.ravel()[None, :]).ravel()
+        ys = (ys[:, None] + dy.ravel()[None, :]).ravel()
+    inside = (xs >= 0) & (xs < image.shape[1]) & (ys >= 0) & (ys < image.shape[0])
+    image[ys[inside], xs[inside]] = color
+
+
+def _fill_rectangle(image, x0, y0, x1, y1, color):
+    color = _parse_color(color)
+    if color is None:
+        return
+    left, right = sorted((int(round(x0)), int(round(x1))))
+    top, bottom = sorted((int(round(y0)), int(round(y1))))
+    image[max(top, 0):max(bottom, 0), max(left, 0):max(right, 0)] = color
+
+
+def _draw_oval(image, box, fill, outline, width):
+    x0, y0, x1, y1 = box
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    rx, ry = max(abs(x1 - x0) / 2, 0.5), max(abs(y1 - y0) / 2, 0.5)
+    top, bottom = int(np.floor(cy - ry)), int(np.ceil(cy + ry))
+    left, right = int(np.floor(cx - rx)), int(np.ceil(cx + rx))
+    ys, xs = np.mgrid[top:bottom + 1, left:right + 1]
+    distance = ((xs + 0.5 - cx) / rx) ** 2 + ((ys + 0.5 - cy) / ry) ** 2
+    fill_color = _parse_color(fill)
+    if fill_color is not None:
+        inside = distance <= 1
+        _plot(image, xs[inside], ys[inside], fill)
+    if _parse_color(outline) is not None:
+        angles = np.linspace(0, 2 * np.pi, max(int(4 * (rx + ry)), 8), endpoint=False)
+        _plot(image, np.rint(cx + rx * np.cos(angles) - 0.5).astype(np.intp),
+              np.rint(cy + ry * np.sin(angles) - 0.5).astype(np.intp), outline, width)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Draws payoff time charts without a display")
+    parser.add_argument('directory', help='the directory to write the charts to')
+    parser.add_argument('scenarios', nargs='+', metavar='BALANCE,APR',
+                        help='the initial balance and yearly interest rate of each chart')
+    parser.add_argument('--format', choices=('svg', 'png'), default='svg',
+                        help='the image format (default: svg)')
+    args = parser.parse_args(args)
+
+    scenarios = [tuple(float(value) for value in scenario.split(',')) for scenario in args.scenarios]
+    start = time.perf_counter()
+    paths = render_scenarios(scenarios, args.directory, args.format)
+    elapsed = time.perf_counter() - start
+    print("Wrote {0} charts in {1:.2f}s ({2:.1f} ms each)".format(
+        len(paths), elapsed, 1000 * elapsed / len(paths)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+import numpy as np
+
+
+class PayoffTable(object):
+    """Compact in-memory table of payoff times for a grid of (initial balance,
+    interest rate, monthly payment) values.
+
+    The payoff times are held in a single 3-D float32 array indexed by the
+    positions of the values along each GridAxis, rather than as nested dicts
+    keyed by floats. Values are located on an axis by constant-time arithmetic
+    with a small tolerance, so lookups do not depend on exact float equality.
+
+    Attributes:
+        balances    (GridAxis): The initial balance values
+        rates       (GridAxis): The interest rate values
+        payments    (GridAxis): The monthly payment values
+        times       (np.ndarray): The payoff times in months, with shape
+            (len(balances), len(rates), len(payments)). Cells that are never
+            paid off hold inf.
+
+    Public methods:
+        PayoffTable(balances, rates, payments, times=None)
+        PayoffTable.from_rows(rows, balances, rates, payments)
+        index_of(axis, value)
+        get(Bo, r, p)
+        curve(Bo, r)
+        rate_slice(r)
+        nbytes (property)
+    """
+    def __init__(self, balances, rates, payments, times=None):
+        self.balances = balances
+        self.rates = rates
+        self.payments = payments
+        shape = (len(self.balances), len(self.rates), len(self.payments))
+        if times is None:
+            times = np.full(shape, np.inf, dtype=np.float32)
+        elif times.shape != shape:
+            raise ValueError("times has shape {}, expected {}".format(times.shape, shape))
+        self.times = times
+
+    @classmethod
+    def from_rows(cls, rows, balances, rates, payments):
+        """Builds a table from chunks of rows.
+
+        Args:
+            rows (iterable): Chunks of (Bo, r, p, t) rows, each chunk a sequence
+                of tuples. Cells without a row are left as never paid off.
+            balances, rates, payments (GridAxis): The values along each axis
+        """
+        table = cls(balances, rates, payments)
+        for chunk in rows:
+            chunk = np.asarray(chunk, dtype=float).reshape(-1, 4)
+            index = (table.balances.indexes_of(chunk[:, 0]),
+                     table.rates.indexes_of(chunk[:, 1]),
+                     table.payments.indexes_of(chunk[:, 2]))
+            table.times[index] = chunk[:, 3]
+        return table
+
+    def index_of(self, axis, value):
+        """Returns the position of value along the axis named 'Bo', 'r', or 'p'.
+
+        Raises:
+            ValueError: Raised if value is not one of the axis values
+        """
+        return self._axis(axis).index_of(value)
+
+    def get(self, Bo, r, p):
+        """Returns the payoff time in months for given values of Bo, r, and p.
+
+        Raises:
+            ValueError: Raised if the values are not in the table, or the loan
+                is never paid off
+        """
+        t = float(self.times[self.index_of('Bo', Bo), self.index_of('r', r), self.index_of('p', p)])
+        if not np.isfinite(t):
+            raise ValueError("Bo={}, r={}, p={} is never paid off".format(Bo, r, p))
+        return t
+
+    def curve(self, Bo, r):
+        """Returns the (payments, times) arrays for given values of Bo and r"""
+        return self.payments.values(), self.times[self.index_of('Bo', Bo), self.index_of('r', r)]
+
+    def rate_slice(self, r):
+        """Returns the (balance x payment) array of payoff times for a given value of r"""
+        return self.times[:, self.index_of('r', r), :]
+
+    @property
+    def nbytes(self):
+        """The memory footprint of the table in bytes"""
+        return self.times.nbytes
+
+    def _axis(self, axis):
+        return {'Bo': self.balances, 'r': self.rates, 'p': self.payments}[axis]
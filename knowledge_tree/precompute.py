@@ -0,0 +1,146 @@
+"""Precomputes the grid store of payoff times on all of the cores of the machine.
+
+The grid is split into shards of consecutive initial balance steps. Worker
+processes calculate whole shards, and the main process is the only writer:
+it copies each finished shard into the memory-mapped store, flushes it, and
+records the range of steps of the shard in a checkpoint file. An interrupted
+run started again with the same axes resumes from the steps that were not
+yet recorded, even with a different shard size.
+
+After the ranges in constants change, --update copies the cells that an
+existing store already holds and calculates only the rest.
+
+Usage:
+    python -m knowledge_tree.precompute payoff_times.grid [--workers N] [--shard-size N] [--restart]
+        [--encoding {float32,months}]
+    python -m knowledge_tree.precompute payoff_times.grid --update
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import knowledge_tree.constants as constants
+from knowledge_tree.grid_store import ENCODINGS, GridStore, compute_slab
+
+
+def checkpoint_path(path):
+    """Returns the path of the checkpoint file of a store being precomputed"""
+    return path + '.checkpoint'
+
+
+def precompute(path, axes=None, workers=None, shard_size=1, restart=False, report=None,
+               encoding=None):
+    """Calculates every shard of the store at path that is not yet checkpointed.
+
+    Args:
+        path (str): The store file to write
+        axes (dict): The GridAxis of each axis, keyed by 'Bo', 'r', and 'p'.
+            Defaults to the axes in constants.
+        workers (int): The number of worker processes. Defaults to the number of cores.
+        shard_size (int): The number of initial balance steps in each shard
+        restart (bool): Ignore any checkpoint and start from scratch
+        report (function): Called with (shards done, shard count) after each shard is written
+        encoding (str): How to store the times, one of grid_store.ENCODINGS. Defaults
+            to the encoding of the store being resumed, or 'float32' for a new one.
+    Returns:
+        The number of shards calculated by this run
+    """
+    if axes is None:
+        axes = {
+            'Bo': constants.initial_balance_axis(),
+            'r': constants.interest_rate_axis(),
+            'p': constants.monthly_payment_axis()}
+    shards = [(start, min(start + shard_size, len(axes['Bo'])))
+              for start in range(0, len(axes['Bo']), shard_size)]
+
+    done = set()    # the balance steps of every shard recorded as written
+    store = None
+    if not restart and os.path.exists(checkpoint_path(path)) and os.path.exists(path):
+        store = GridStore.open(path, writable=True)
+        if store.axes == axes and encoding in (None, store.encoding):
+            done = _read_checkpoint(path)
+        else:
+            store = None
+    if store is None:
+        store = GridStore.create(path, axes, encoding or 'float32')
+        open(checkpoint_path(path), 'w').close()
+
+    # A shard is only skipped if it is wholly covered, since the shard size
+    # may differ from that of the run that wrote the checkpoint
+    pending = [shard for shard in shards if not done.issuperset(range(*shard))]
+    calculated = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor, \
+            open(checkpoint_path(path), 'a') as checkpoint:
+        max_in_flight = 2 * (workers or os.cpu_count() or 1)
+        in_flight = {}
+        while pending or in_flight:
+            while pending and len(in_flight) < max_in_flight:
+                start, stop = pending.pop(0)
+                in_flight[executor.submit(compute_slab, axes, start, stop)] = (start, stop)
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                start, stop = in_flight.pop(future)
+                store.write(start, stop, future.result())
+                store.data.flush()
+                checkpoint.write('{},{}\n'.format(start, stop))
+                checkpoint.flush()
+                os.fsync(checkpoint.fileno())
+                done.update(range(start, stop))
+                calculated += 1
+                if report is not None:
+                    report(len(shards) - len(pending) - len(in_flight), len(shards))
+
+    os.remove(checkpoint_path(path))
+    return calculated
+
+
+def _read_checkpoint(path):
+    """Returns the set of balance steps covered by the shards recorded as written.
+    Each line of the checkpoint holds the start and stop steps of one shard."""
+    done = set()
+    with open(checkpoint_path(path)) as f:
+        for line in f:
+            if line.strip():
+                start, stop = map(int, line.split(','))
+                done.update(range(start, stop))
+    return done
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('path', help='the grid store file to write')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of worker processes (default: one per core)')
+    parser.add_argument('--shard-size', type=int, default=1,
+                        help='initial balance steps per shard (default: 1)')
+    parser.add_argument('--restart', action='store_true',
+                        help='ignore any checkpoint and start from scratch')
+    parser.add_argument('--encoding', choices=ENCODINGS, default=None,
+                        help='store float32 months, or whole months as uint16 (default: that of '
+                             'the existing store, else float32)')
+    parser.add_argument('--update', action='store_true',
+                        help='reuse the cells of an existing store and calculate only the new ones')
+    args = parser.parse_args(args)
+    if args.update and (args.workers is not None or args.restart):
+        # An update runs in this process, and always starts from the existing store
+        parser.error('--update cannot be combined with --workers or --restart')
+
+    start = time.perf_counter()
+    if args.update:
+        store, calculated = GridStore.update(args.path, encoding=args.encoding)
+        print("Calculated {0} of {1} cells ({2:.1f}s)".format(
+            calculated, store.data.size, time.perf_counter() - start))
+        return
+
+    def report(done, total):
+        elapsed = time.perf_counter() - start
+        print("Shard {0}/{1} written ({2:.0f}%, {3:.1f}s)".format(done, total, 100 * done / total, elapsed))
+
+    precompute(args.path, workers=args.workers, shard_size=args.shard_size,
+               restart=args.restart, report=report, encoding=args.encoding)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Compact integer encoding of payoff times.
+
+Payoff times only need month precision, so they can be stored as a uint16
+number of months instead of a float. The largest code is reserved for loans
+that are never paid off.
+"""
+import numpy as np
+
+
+DTYPE = np.dtype('<u2')
+NEVER_PAID_OFF = np.iinfo(DTYPE).max
+MAX_MONTHS = NEVER_PAID_OFF - 1
+
+
+class AccuracyReport(object):
+    """How closely encoded payoff times match the times they were encoded from
+
+    Attributes:
+        cells       (int): The number of cells compared
+        max_error   (float): The largest absolute error in months of a finite time
+        mean_error  (float): The mean absolute error in months of the finite times
+        saturated   (int): The number of finite times above MAX_MONTHS, which
+            decode as MAX_MONTHS
+        mismatched  (int): The number of cells that are never paid off in one
+            array but not in the other
+    """
+    def __init__(self, cells=0, max_error=0.0, mean_error=0.0, saturated=0, mismatched=0):
+        self.cells = cells
+        self.max_error = max_error
+        self.mean_error = mean_error
+        self.saturated = saturated
+        self.mismatched = mismatched
+
+    def __repr__(self):
+        return ("AccuracyReport(cells={}, max_error={}, mean_error={}, saturated={}, "
+                "mismatched={})".format(self.cells, self.max_error, self.mean_error,
+                                        self.saturated, self.mismatched))
+
+
+def encode_months(times):
+    """Rounds payoff times in months to the nearest month.
+
+    Args:
+        times (array-like): Payoff times in months. Cells that are not finite
+            are never paid off.
+    Returns:
+        A uint16 array of the same shape. Times above MAX_MONTHS saturate to it.
+    """
+    times = np.asarray(times)
+    finite = np.isfinite(times)
+    months = np.rint(np.clip(np.where(finite, times, 0), 0, MAX_MONTHS))
+    return np.where(finite, months, NEVER_PAID_OFF).astype(DTYPE)
+
+
+def decode_months(codes, dtype=np.float32):
+    """Returns the payoff times in months of an array of encoded times, with inf
+    for the cells that are never paid off"""
+    codes = np.asarray(codes)
+    times = codes.astype(dtype)
+    times[codes == NEVER_PAID_OFF] = np.inf
+    return times
+
+
+def check_accuracy(times, codes=None):
+    """Compares payoff times with their encoding.
+
+    Args:
+        times (array-like): Payoff times in months
+        codes (array-like): The encoded times. Defaults to encode_months(times).
+    Returns:
+        An AccuracyReport
+    """
+    times = np.asarray(times, dtype=float)
+    if codes is None:
+        codes = encode_months(times)
+    decoded = decode_months(codes, dtype=float)
+
+    finite = np.isfinite(times) & np.isfinite(decoded)
+    errors = np.abs(decoded[finite] - times[finite])
+    return AccuracyReport(
+        cells=times.size,
+        max_error=float(errors.max()) if errors.size else 0.0,
+        mean_error=float(errors.mean()) if errors.size else 0.0,
+        saturated=int(np.count_nonzero(times[finite] > MAX_MONTHS)),
+        mismatched=int(np.count_nonzero(np.isfinite(times) != np.isfinite(decoded))))
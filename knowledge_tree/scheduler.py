@@ -0,0 +1,71 @@
+import time
+
+import knowledge_tree.constants as constants
+
+
+class FrameScheduler(object):
+    """Coalesces render requests so that at most one render runs per frame.
+
+    Each request replaces any request still waiting to be rendered, so only
+    the latest state is drawn and a burst of events costs a single render.
+    Renders are scheduled on the Tk event loop with after / after_idle and
+    are spaced at least frame_budget_ms apart.
+
+    Attributes:
+        root            (tk.Tk): The window whose event loop runs the renders
+        render          (function): Called with the arguments of the latest request
+        frame_budget_ms (int): The minimum time between the starts of two renders
+        requests        (int): The number of requests received
+        renders         (int): The number of renders run
+        dropped         (int): The number of requests superseded before they were rendered
+
+    Public methods:
+        request(*args)
+        cancel()
+    """
+    def __init__(self, root, render, frame_budget_ms=constants.frame_budget_ms):
+        self.root = root
+        self.render = render
+        self.frame_budget_ms = frame_budget_ms
+        self.requests = 0
+        self.renders = 0
+        self.dropped = 0
+        self._pending = None
+        self._after_id = None
+        self._last_render = None
+
+    def request(self, *args):
+        """Requests a render with the given arguments, replacing any pending request"""
+        self.requests += 1
+        if self._pending is not None:
+            self.dropped += 1
+        self._pending = args
+
+        if self._after_id is None:
+            delay_ms = 0
+            if self._last_render is not None:
+                elapsed_ms = (time.perf_counter() - self._last_render) * 1000
+                delay_ms = max(0, int(self.frame_budget_ms - elapsed_ms))
+            if delay_ms:
+                self._after_id = self.root.after(delay_ms, self._flush)
+            else:
+                self._after_id = self.root.after_idle(self._flush)
+
+    def cancel(self):
+        """Drops the pending request, if any, without rendering it"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if self._pending is not None:
+            self.dropped += 1
+            self._pending = None
+
+    def _flush(self):
+        """Renders the latest request"""
+        self._after_id = None
+        args, self._pending = self._pending, None
+        if args is None:
+            return
+        self._last_render = time.perf_counter()
+        self.renders += 1
+        self.render(*args)
@@ -0,0 +1,60 @@
+"""Timing of the phases of startup.
+
+Kept free of heavy imports so that it can be loaded, and start timing,
+before anything else.
+
+Set the KNOWLEDGE_TREE_STARTUP_TRACE environment variable to print the trace
+once the first curve has been drawn.
+"""
+import time
+
+
+ENVIRONMENT_VARIABLE = 'KNOWLEDGE_TREE_STARTUP_TRACE'
+
+
+class StartupTrace(object):
+    """Records how long each phase of startup took
+
+    Attributes:
+        start   (float): The time.perf_counter() the trace counts from
+        phases  (list): (name, seconds) of each phase marked, in order
+
+    Public methods:
+        StartupTrace(start=None)
+        mark(phase)
+        elapsed(phase=None)
+        format()
+    """
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.phases = []
+        self._last = self.start
+
+    def mark(self, phase):
+        """Ends a phase, which began when the previous phase ended, and returns its duration"""
+        now = time.perf_counter()
+        seconds = now - self._last
+        self.phases.append((phase, seconds))
+        self._last = now
+        return seconds
+
+    def elapsed(self, phase=None):
+        """Returns the seconds from the start to the end of phase, or to the last
+        phase marked. Raises KeyError if phase was not marked."""
+        total = 0.0
+        for name, seconds in self.phases:
+            total += seconds
+            if name == phase:
+                return total
+        if phase is not None:
+            raise KeyError(phase)
+        return total
+
+    def format(self):
+        """Formats the trace as lines of text, one per phase, in milliseconds"""
+        lines = []
+        total = 0.0
+        for name, seconds in self.phases:
+            total += seconds
+            lines.append('{0:<16} {1:>8.1f}ms {2:>8.1f}ms'.format(name, seconds * 1000, total * 1000))
+        return lines
@@ -3,59 +3,106 @@ import tkinter as tk
 import knowledge_tree.constants as constants
 from knowledge_tree.point import Point
 from knowledge_tree.axes import Axes
-from knowledge_tree.financial_tools import payments_to_payoff
+from knowledge_tree.curve_cache import CurveCache
+from knowledge_tree.financial_tools import payments_to_payoff_array
 
 
 class View(object):
     """Manages all of the visible components of the program, including the
     displayed graph.
+
+    Attributes:
+        series (AxesSeries): The payoff time vs. payment curve plotted on the axes
+        heatmap (Heatmap): The rate x payment plane at the current balance, or None
+            while the heatmap is switched off
+        curve_cache (CurveCache): Curves already computed, shared by all Views
+
+    Public methods:
+        View(main=None, canvas=None, plot_curve=True)
+        update_axes(a, i)
+        show_heatmap(a)
+        hide_heatmap()
+        update_heatmap(a)
+        compute_curve(a, i)
+        apply_curve(curve)
+
+    A View draws on a new tk.Canvas in main's root window, or on the canvas
+    it is given, which need not belong to a window. With plot_curve=False the
+    axes start out empty, and the curve is drawn by the first apply_curve.
     """ 
+    curve_cache = CurveCache(snap=True)
 
-    def __init__(self, main=None):
+    def __init__(self, main=None, canvas=None, plot_curve=True):
     
-        if not main:
+        if not main and canvas is None:
             raise ValueError("No value provided for main")
             
         self.main = main
-        self.canvas = tk.Canvas(
-            self.main.root,
-            background='#FFFFFF',
-            **constants.canvas_dimensions)
+        if canvas is None:
+            canvas = tk.Canvas(
+                self.main.root,
+                background='#FFFFFF',
+                **constants.canvas_dimensions)
+            canvas.grid()
+        self.canvas = canvas
         self.axes = Axes(
             canvas=self.canvas,
             **constants.axes_display,
             **constants.axes_scale)
                                 
-        self.canvas.grid()
+        self.axes.enable_zoom_and_pan()
+        self.axes.enable_hover_tooltips(text_format=constants.tooltip_format)
 
-        for p in constants.monthly_payment_range():
-            a = constants.initial_balance['default']
-            i = constants.interest_rate['default']
-            payoff_months = payments_to_payoff(a, i / 12, p)
-
-            if payoff_months is None or payoff_months / 12 > constants.axes_scale['y_max']:
-                point = self.axes.add_point(p, 0)
-                self.axes.hide_point(point)
-            else:
-                self.axes.add_point(p, payoff_months / 12)
+        if plot_curve:
+            payments, payoff_years = self.compute_curve(
+                constants.initial_balance['default'], constants.interest_rate['default'])
+        else:
+            payments = payoff_years = ()
+        self.series = self.axes.plot_series(payments, payoff_years)
+        self.heatmap = None
 
     def update_axes(self, a, i):
         """Updates the points on the axes to reflect the new values of a and i.
 
         Args:
             a (numeric): The initial balance of the loan
-            i (numeric): The interest rate per payment period (NOT per year) in decimal form
+            i (numeric): The yearly interest rate (APR) in decimal form
+        """
+        self.apply_curve(self.compute_curve(a, i))
+
+    def show_heatmap(self, a):
+        """Switches on the heatmap, drawn for initial balance a"""
+        if self.heatmap is None:
+            # Imported on first use, so that it does not slow down startup
+            from knowledge_tree.heatmap import Heatmap
+            self.heatmap = Heatmap(canvas=self.canvas, **constants.heatmap_display)
+        self.heatmap.update(a)
+        self.heatmap.show()
+
+    def hide_heatmap(self):
+        """Switches off the heatmap"""
+        if self.heatmap is not None:
+            self.heatmap.destroy()
+            self.heatmap = None
+
+    def update_heatmap(self, a):
+        """Redraws the heatmap, if it is switched on, for initial balance a"""
+        if self.heatmap is not None:
+            self.heatmap.update(a)
+
+    @staticmethod
+    def compute_curve(a, i):
+        """Returns the (payments, payoff years) arrays to plot for given values of a and i.
+
+        This does not touch any Tk state, so it may be run on any thread or process.
         """
-        for p in constants.monthly_payment_range():
-            try:
-                payoff_months = payments_to_payoff(a, i / 12, p)
-            except AssertionError:
-                # payments_to_payoff failed preconditions
-                continue
-
-            point = self.axes.get_point_by_x(p)
-            if payoff_months is None or payoff_months / 12 > constants.axes_scale['y_max']:
-                self.axes.hide_point(point)
-            else:
-                self.axes.show_point(point)
-                self.axes.move_point(point, p, payoff_months / 12)
+        return View.curve_cache.get(a, i, View._calculate_curve)
+
+    @staticmethod
+    def _calculate_curve(a, i):
+        payments = constants.monthly_payment_axis().values()
+        return payments, payments_to_payoff_array(a, i / 12, payments) / 12
+
+    def apply_curve(self, curve):
+        """Moves the plotted curve to a curve returned by compute_curve"""
+        self.axes.update_series(self.series, *curve)
@@ -9,7 +9,7 @@ setup(
     author='Daniel Oliver King',
     author_email='daniel.oliver.king@gmail.com',
     packages=['knowledge_tree'],
-    requires=['nose', 'peewee'],
+    requires=['nose', 'peewee', 'numpy'],
     scripts=[],
     description='Interactive program that shows how long it will take to pay off a loan'
 )
@@ -0,0 +1,229 @@
+from nose.tools import *
+import numpy as np
+
+from knowledge_tree.axes import Axes
+
+
+class FakeCanvas(object):
+    """Stands in for tk.Canvas, recording the items drawn on it and the calls made"""
+    def __init__(self):
+        self.items = {}
+        self.next_reference = 1
+        self.calls = 0
+        self.idle_callbacks = []
+        self.bindings = {}
+
+    def _create(self, kind, coords, options):
+        self.calls += 1
+        reference = self.next_reference
+        self.next_reference += 1
+        self.items[reference] = {'type': kind, 'coords': list(coords), 'options': dict(options)}
+        return reference
+
+    def create_line(self, *coords, **options):
+        return self._create('line', coords, options)
+
+    def create_oval(self, *coords, **options):
+        return self._create('oval', coords, options)
+
+    def create_text(self, *coords, **options):
+        return self._create('text', coords, options)
+
+    def create_rectangle(self, *coords, **options):
+        return self._create('rectangle', coords, options)
+
+    def create_image(self, *coords, **options):
+        return self._create('image', coords, options)
+
+    def bbox(self, reference):
+        x, y = self.items[reference]['coords'][:2]
+        return x, y - 10, x + 60, y
+
+    def tag_raise(self, reference):
+        self.calls += 1
+
+    def coords(self, reference, *coords):
+        self.calls += 1
+        if coords:
+            self.items[reference]['coords'] = list(coords)
+        return self.items[reference]['coords']
+
+    def itemconfigure(self, reference, **options):
+        self.calls += 1
+        self.items[reference]['options'].update(options)
+
+    def bind(self, sequence, callback):
+        self.bindings[sequence] = callback
+
+    def after_idle(self, callback):
+        self.idle_callbacks.append(callback)
+        return callback
+
+    def after(self, delay_ms, callback):
+        return self.after_idle(callback)
+
+    def after_cancel(self, callback):
+        self.idle_callbacks.remove(callback)
+
+    def run_idle(self):
+        callbacks, self.idle_callbacks = self.idle_callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def delete(self, reference):
+        self.calls += 1
+        del self.items[reference]
+
+
+def make_axes(canvas=None):
+    return Axes(canvas=canvas or FakeCanvas(), corner_x=100, corner_y=500,
+                display_width=400, display_height=400,
+                x_min=0, x_max=4000, x_step=500, y_min=0, y_max=30, y_step=5)
+
+
+def test_point_lookups():
+    axes = make_axes()
+    points = [axes.add_point(x, x / 100) for x in range(0, 4000, 100)]
+
+    assert_is(axes.get_point_by_x(500), points[5])
+    assert_is(axes.get_point_by_y(5), points[5])
+    assert_raises(ValueError, axes.get_point_by_x, 550)
+    assert_is(axes.get_nearest_point_by_x(540), points[5])
+    assert_is(axes.get_nearest_point_by_x(-10), points[0])
+    assert_is(axes.get_nearest_point_by_y(1000), points[-1])
+
+
+def test_index_follows_moves_and_visibility():
+    axes = make_axes()
+    points = [axes.add_point(x, 10) for x in range(0, 1000, 100)]
+
+    axes.move_point(points[3], 300, 20)
+    assert_is(axes.get_point_by_y(20), points[3])
+    assert_is(axes.get_nearest_point_by_y(19), points[3])
+
+    axes.hide_point(points[3])
+    assert_is_not(axes.get_nearest_point_by_x(300, visible_only=True), points[3])
+    assert_is(axes.get_nearest_point_by_x(300), points[3])
+
+
+def test_update_points_only_touches_changed_items():
+    canvas = FakeCanvas()
+    axes = make_axes(canvas)
+    points = [axes.add_point(x, 10) for x in range(0, 1000, 100)]
+    canvas.calls = 0
+
+    axes.update_points((point, point.x, 10.001, True) for point in points)
+    axes.update_points([(points[0], 0, 20, True), (points[1], 100, 25, False)])
+    assert_equal(canvas.calls, 0)
+
+    canvas.run_idle()
+    assert_equal(canvas.calls, 2)
+    assert_equal(canvas.items[points[1].reference]['options']['state'], 'hidden')
+    assert_is(axes.get_point_by_y(20), points[0])
+    assert_equal(canvas.idle_callbacks, [])
+
+
+def test_sparse_series_is_drawn_as_markers():
+    canvas = FakeCanvas()
+    axes = make_axes(canvas)
+    xs = np.arange(0, 4001, 100)
+    ys = np.where(xs < 500, np.inf, 10000 / (xs + 1))
+    series = axes.plot_series(xs, ys)
+    canvas.run_idle()
+
+    assert_equal(series.rendered_as, 'markers')
+    assert_equal(len(series.points), len(xs))
+    assert_equal(sum(point.visible for point in series.points), len(xs) - 5)
+    assert_equal(series.lines, [])
+
+
+def test_dense_series_is_drawn_as_a_polyline():
+    canvas = FakeCanvas()
+    axes = make_axes(canvas)
+    xs = np.linspace(0, 4000, 20001)
+    series = axes.plot_series(xs, 10 + np.sin(xs), marker_spacing=50)
+    canvas.run_idle()
+
+    assert_equal(series.rendered_as, 'line')
+    assert_equal(len(series.lines), 1)
+    assert_true(len(series.line_coords[0]) // 2 <= 4 * 401)
+    assert_equal(len(series.points), 9)
+
+    canvas.calls = 0
+    axes.update_series(series, xs, 10 + np.sin(xs))
+    canvas.run_idle()
+    assert_equal(canvas.calls, 0)
+
+    axes.update_series(series, xs[::200], 5 + xs[::200] / 1000)
+    canvas.run_idle()
+    assert_equal(series.rendered_as, 'markers')
+    assert_equal(canvas.items[series.lines[0][0]]['options']['state'], 'hidden')
+
+
+def _tick_labels(canvas, axes, axis):
+    return [canvas.items[label]['options']['text']
+            for line, label, tick, visible in axes.tick_items[axis] if visible]
+
+
+def test_ticks():
+    canvas = FakeCanvas()
+    axes = make_axes(canvas)
+    assert_equal(_tick_labels(canvas, axes, 'x'), ['500', '1000', '1500', '2000', '2500', '3000', '3500'])
+    assert_equal(_tick_labels(canvas, axes, 'y'), ['5', '10', '15', '20', '25'])
+
+    items = len(canvas.items)
+    axes.set_viewport(1000, 2000, 0, 30)
+    assert_equal(_tick_labels(canvas, axes, 'x'), ['1200', '1400', '1600', '1800'])
+    assert_equal(len(canvas.items), items)
+
+    axes.reset_viewport()
+    assert_equal(_tick_labels(canvas, axes, 'x'), ['500', '1000', '1500', '2000', '2500', '3000', '3500'])
+    assert_equal(len(canvas.items), items)
+
+
+def test_zoom_and_pan_cull_points():
+    canvas = FakeCanvas()
+    axes = make_axes(canvas)
+    points = [axes.add_point(x, 10) for x in range(0, 4000, 100)]
+
+    axes.zoom(4, *axes._get_canvas_coords(2000, 10))
+    canvas.run_idle()
+    assert_almost_equal(axes.scale['x_min'], 1500)
+    assert_almost_equal(axes.scale['x_max'], 2500)
+    shown = [point.x for point in points if point.canvas_visible]
+    assert_equal(shown, list(range(1500, 2600, 100)))
+    assert_equal(canvas.items[points[20].reference]['coords'][0], 100 + 200 - 3)
+
+    axes.pan(-400, 0)
+    canvas.run_idle()
+    assert_almost_equal(axes.scale['x_min'], 2500)
+    assert_true(points[20].visible)
+    assert_false(points[20].canvas_visible)
+
+
+class MotionEvent(object):
+    def __init__(self, x, y):
+        self.x, self.y = x, y
+
+
+def test_hover_tooltip():
+    canvas = FakeCanvas()
+    axes = make_axes(canvas)
+    points = [axes.add_point(x, 10) for x in range(0, 4000, 100)]
+    axes.enable_hover_tooltips()
+
+    canvas_x, canvas_y = axes._get_canvas_coords(1000, 10)
+    for dx in range(5):
+        canvas.bindings['<Motion>'](MotionEvent(canvas_x + dx, canvas_y + 2))
+    canvas.run_idle()
+
+    text = canvas.items[axes.tooltip['text']]
+    assert_equal(text['options']['text'], '(1000, 10)')
+    assert_equal(text['options']['state'], 'normal')
+    assert_equal(axes.tooltip['scheduler'].renders, 1)
+
+    axes.hide_point(points[10])
+    assert_is_not(axes.get_point_at(canvas_x, canvas_y), points[10])
+    canvas.bindings['<Motion>'](MotionEvent(canvas_x, canvas_y - 100))
+    canvas.run_idle()
+    assert_equal(text['options']['state'], 'hidden')
@@ -0,0 +1,24 @@
+from nose.tools import *
+
+import knowledge_tree.constants as constants
+from knowledge_tree.benchmark import SCALED_RANGES, compare, run_benchmarks, scaled_ranges
+
+
+def test_scaled_ranges_are_restored():
+    original = dict(constants.interest_rate)
+    with scaled_ranges():
+        assert_equal(constants.interest_rate, SCALED_RANGES['interest_rate'])
+    assert_equal(constants.interest_rate, original)
+
+
+def test_run_benchmarks():
+    results = run_benchmarks(['payoff_array', 'view_update_axes'], repeat=1)
+    assert_equal(sorted(results['benchmarks']), ['payoff_array', 'view_update_axes'])
+    assert_true(results['benchmarks']['payoff_array']['seconds'] > 0)
+    assert_equal(results['benchmarks']['view_update_axes']['operations'], 200)
+
+
+def test_compare():
+    baseline = {'benchmarks': {'a': {'seconds': 1.0}, 'b': {'seconds': 1.0}}}
+    results = {'benchmarks': {'a': {'seconds': 1.2}, 'b': {'seconds': 1.3}, 'c': {'seconds': 9}}}
+    assert_equal(compare(results, baseline, threshold=0.25), [('b', 1.3, 1.0)])
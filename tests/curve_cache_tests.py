@@ -0,0 +1,60 @@
+from nose.tools import *
+
+from knowledge_tree.curve_cache import CurveCache
+from knowledge_tree.grid_axis import GridAxis
+
+
+def _compute(calls):
+    def compute(balance, rate):
+        calls.append((balance, rate))
+        return [(100.0, balance * rate)]
+    return compute
+
+
+def test_hits_and_misses():
+    calls = []
+    cache = CurveCache()
+    cache.get(100000, 0.0675, _compute(calls))
+    cache.get(100000, 0.0675 + 1e-15, _compute(calls))
+
+    assert_equal(len(calls), 1)
+    assert_equal((cache.hits, cache.misses), (1, 1))
+
+
+def test_snapping():
+    calls = []
+    cache = CurveCache(snap=True)
+    cache.get(100400, 0.0675, _compute(calls))
+    assert_equal(calls, [(100000, 675 * 0.0001)])
+    assert_raises(ValueError, CurveCache().get, 100400, 0.0675, _compute(calls))
+
+
+def test_keys_follow_the_axes_given():
+    calls = []
+    cache = CurveCache()
+    axes = (GridAxis(0, 250, 5), GridAxis(0, 0.01, 3))
+    cache.get(750, 0.02, _compute(calls), axes)
+    cache.get(750, 0.02, _compute(calls), axes)
+    assert_equal(calls, [(750, 0.02)])
+    # 750 is not on the balance axis in constants
+    assert_raises(ValueError, cache.get, 750, 0.02, _compute(calls))
+
+
+def test_lru_eviction():
+    calls = []
+    cache = CurveCache(max_entries=2, max_bytes=None)
+    for balance in (1000, 2000, 1000, 3000):
+        cache.get(balance, 0.05, _compute(calls))
+    cache.get(1000, 0.05, _compute(calls))
+
+    assert_equal(len(cache), 2)
+    assert_equal(cache.evictions, 1)
+    assert_equal(len(calls), 3)
+
+
+def test_byte_limit():
+    cache = CurveCache(max_entries=None, max_bytes=64)
+    for balance in (1000, 2000, 3000):
+        cache.get(balance, 0.05, _compute([]))
+    assert_equal(len(cache), 2)
+    assert_true(cache.nbytes <= 64)
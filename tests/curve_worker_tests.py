@@ -0,0 +1,63 @@
+from concurrent.futures import Future
+
+from nose.tools import *
+
+from knowledge_tree.curve_worker import CurveWorker
+from tests.scheduler_tests import FakeRoot
+
+
+class ManualExecutor(object):
+    """Stands in for an Executor, finishing submitted work only when asked"""
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.jobs.append((future, fn, args))
+        return future
+
+    def finish_all(self):
+        for future, fn, args in self.jobs:
+            if not future.done():
+                future.set_result(fn(*args))
+
+
+def test_stale_results_are_dropped():
+    root = FakeRoot()
+    executor = ManualExecutor()
+    results = []
+    worker = CurveWorker(root, lambda a, i: (a, i), results.append, executor=executor)
+
+    worker.submit(1, 0.05)
+    worker.submit(2, 0.05)
+    worker.submit(3, 0.05)
+    assert_equal(len(executor.jobs), 1)
+
+    executor.finish_all()
+    root.run()
+    assert_equal(results, [])
+    assert_equal(worker.stale, 1)
+    assert_equal(len(executor.jobs), 2)
+
+    executor.finish_all()
+    root.run()
+    assert_equal(results, [(3, 0.05)])
+
+
+def test_failed_requests_do_not_block_the_next():
+    root = FakeRoot()
+    executor = ManualExecutor()
+    results = []
+    worker = CurveWorker(root, lambda a, i: (a, i), results.append, executor=executor)
+
+    worker.submit(1, 0.05)
+    worker.submit(2, 0.05)
+    executor.jobs[0][0].set_exception(ValueError('off the grid'))
+    root.run()
+    assert_equal(worker.failed, 1)
+    assert_true(isinstance(worker.last_error, ValueError))
+    assert_equal(len(executor.jobs), 2)
+
+    executor.finish_all()
+    root.run()
+    assert_equal(results, [(2, 0.05)])
@@ -0,0 +1,96 @@
+from nose.tools import *
+
+import knowledge_tree.database as database
+import knowledge_tree.constants as constants
+from knowledge_tree.model import Model
+
+
+def setup_module():
+    database.initialize(':memory:')
+
+
+def teardown_module():
+    database.db.close()
+
+
+def _rows(count):
+    return ((1000.0 * n, 0.0, 100.0, float(n)) for n in range(count))
+
+
+def test_bulk_insert_points():
+    database.DataPoint.delete().execute()
+    reports = []
+    stats = database.bulk_insert_points(_rows(25), batch_size=4, commit_interval=10, report=reports.append)
+
+    assert_equal(stats.rows, 25)
+    assert_equal(len(reports), 3)
+    assert_equal(database.DataPoint.select().count(), 25)
+
+
+def test_bulk_insert_points_exact_multiple_of_commit_interval():
+    database.DataPoint.delete().execute()
+    committed = []
+    stats = database.bulk_insert_points(_rows(20), batch_size=4, commit_interval=10,
+                                        report=lambda stats: committed.append(stats.rows))
+
+    assert_equal(stats.rows, 20)
+    assert_equal(committed, [10, 20])
+
+
+def test_payoff_rows_are_on_the_grid():
+    for Bo, r, p, t in Model.payoff_rows():
+        if r > 0.05:
+            break
+    assert_equal(r, database.snap_to_grid(r + 1e-12, constants.interest_rate_axis()))
+    assert_equal(Bo, database.snap_to_grid(Bo, constants.initial_balance_axis()))
+
+
+def test_point_queries():
+    database.DataPoint.delete().execute()
+    r = database.snap_to_grid(0.0675, constants.interest_rate_axis())
+    database.bulk_insert_points((100000.0, r, p, p / 10) for p in (1000.0, 900.0, 800.0))
+
+    assert_equal(database.get_payoff_time(100000, 0.0675, 900), 90)
+    assert_raises(ValueError, database.get_payoff_time, 100000, 0.0675, 700)
+    assert_equal(
+        database.get_time_vs_payment_data(100000, 0.0675),
+        [(800.0, 80.0), (900.0, 90.0), (1000.0, 100.0)])
+
+
+def test_purge_points():
+    database.DataPoint.delete().execute()
+    database.bulk_insert_points(_rows(100))
+
+    progress = list(database.purge_points(chunk_size=40))
+    assert_equal(progress, [40, 80, 100])
+    assert_equal(database.DataPoint.select().count(), 0)
+
+
+def test_purge_points_truncate():
+    database.bulk_insert_points(_rows(10))
+
+    assert_equal(list(database.purge_points(truncate=True, reclaim_space=True)), [100])
+    assert_equal(database.DataPoint.select().count(), 0)
+
+
+def test_migrate_from_id_schema():
+    database.db.drop_tables([database.DataPoint])
+    database.db.execute_sql(
+        'CREATE TABLE "datapoint" ("id" INTEGER PRIMARY KEY, "Bo" REAL, "r" REAL, "p" REAL, "t" REAL)')
+    database.db.execute_sql(
+        'INSERT INTO "datapoint" VALUES (1, 100000.0, 0.06750000000000046, 900.0, 90.0)')
+    database.db.execute_sql('PRAGMA user_version = 0')
+
+    database.migrate()
+    assert_equal(database.get_payoff_time(100000, 0.0675, 900), 90)
+    assert_equal(database.db.execute_sql('PRAGMA user_version').fetchone()[0], database.SCHEMA_VERSION)
+
+
+def test_load_payoff_times():
+    database.DataPoint.delete().execute()
+    rows = [(100000.0, database.snap_to_grid(0.0675, constants.interest_rate_axis()), 900.0, 90.0)]
+    database.bulk_insert_points(rows)
+
+    table = Model(db=database.db).load_payoff_times()
+    assert_equal(table.get(100000, 0.0675, 900), 90)
+    assert_raises(ValueError, table.get, 100000, 0.0675, 1000)
@@ -0,0 +1,36 @@
+import math
+
+from nose.tools import *
+import numpy as np
+
+from knowledge_tree.financial_tools import payments_to_payoff, payments_to_payoff_array
+
+
+def test_payments_to_payoff_matches_formula():
+    a, i, p = 100000, 0.0675 / 12, 1000
+    expected = -math.log(1 - i * a / p) / math.log(1 + i)
+    assert_almost_equal(payments_to_payoff(a, i, p), expected)
+
+
+def test_payments_to_payoff_never_pays_off():
+    assert_is_none(payments_to_payoff(100000, 0.01, 0))
+    assert_is_none(payments_to_payoff(100000, 0.01, 1000))
+    assert_raises(AssertionError, payments_to_payoff, '1', 0.01, 1000)
+
+
+def test_payments_to_payoff_array_broadcasts():
+    balances = np.array([0, 1000, 100000])[:, None]
+    payments = np.array([0, 100, 1000, 4000])[None, :]
+    result = payments_to_payoff_array(balances, 0.005, payments)
+
+    assert_equal(result.shape, (3, 4))
+    assert_true(np.all(result[0] == 0))
+    assert_true(np.isinf(result[1, 0]))
+    assert_true(np.isinf(result[2, 1]))
+    assert_almost_equal(result[2, 3], payments_to_payoff(100000, 0.005, 4000))
+
+
+def test_payments_to_payoff_array_zero_interest():
+    result = payments_to_payoff_array([1000, 1000], 0, [100, 0])
+    assert_equal(result[0], 10)
+    assert_true(np.isinf(result[1]))
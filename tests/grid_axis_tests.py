@@ -0,0 +1,30 @@
+from nose.tools import *
+
+import knowledge_tree.constants as constants
+from knowledge_tree.grid_axis import GridAxis
+
+
+def test_values_do_not_drift():
+    axis = constants.interest_rate_axis()
+    assert_equal(len(axis), 1001)
+    assert_equal(axis[675], 675 * 0.0001)
+    assert_equal(axis.max, 1000 * 0.0001)
+    assert_equal(list(axis)[-1], axis.max)
+
+
+def test_index_of():
+    axis = GridAxis(0, 0.0001, 1001)
+    assert_equal(axis.index_of(0.0675), 675)
+    assert_equal(axis.index_of(0.06750000000001), 675)
+    assert_raises(ValueError, axis.index_of, 0.06755)
+    assert_raises(ValueError, axis.index_of, 0.2)
+    assert_equal(axis.index_of(0.06755, snap=True), 676)
+    assert_equal(axis.index_of(0.2, snap=True), 1000)
+    assert_equal(axis.indexes_of([0, 0.0001, 0.1]).tolist(), [0, 1, 1000])
+
+
+def test_slicing():
+    axis = GridAxis(0, 100, 41)
+    assert_equal(axis[10:20:2], GridAxis(1000, 200, 5))
+    assert_equal(axis[-1], 4000)
+    assert_raises(IndexError, axis.__getitem__, 41)
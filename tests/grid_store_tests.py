@@ -0,0 +1,134 @@
+import os
+import struct
+import tempfile
+
+from nose.tools import *
+import numpy as np
+
+from knowledge_tree.grid_store import GridStore
+from knowledge_tree.financial_tools import FORMULA_VERSION, payments_to_payoff
+from knowledge_tree.interpolation import interpolate_payoff_times
+from knowledge_tree.quantization import check_accuracy
+
+
+BALANCES = {'min': 0, 'max': 10000, 'step': 1000}
+RATES = {'min': 0, 'max': 0.1, 'step': 0.01}
+PAYMENTS = {'min': 0, 'max': 500, 'step': 100}
+
+
+def _build(directory):
+    return GridStore.build(
+        os.path.join(directory, 'test.grid'),
+        initial_balance=BALANCES, interest_rate=RATES, monthly_payment=PAYMENTS)
+
+
+def test_build_and_open():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _build(directory)
+        assert_equal(store.times.shape, (11, 11, 6))
+
+        reopened = GridStore.open(store.path)
+        assert_equal(reopened.axes, store.axes)
+        assert_almost_equal(
+            reopened.get_payoff_time(5000, 0.07, 300),
+            payments_to_payoff(5000, 0.07 / 12, 300),
+            places=3)
+
+
+def test_lookup_errors():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _build(directory)
+        assert_raises(ValueError, store.get_payoff_time, 5500, 0.07, 300)
+        assert_raises(ValueError, store.get_payoff_time, 5000, 0.07, 0)
+        assert_raises(ValueError, store.index_of, 'p', 600)
+
+
+def test_get_time_vs_payment_data():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _build(directory)
+        data = store.get_time_vs_payment_data(10000, 0.1)
+        assert_equal([p for p, t in data], [100, 200, 300, 400, 500])
+
+
+def test_as_table():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _build(directory)
+        table = store.as_table()
+        assert_equal(table.get(5000, 0.07, 300), store.get_payoff_time(5000, 0.07, 300))
+
+
+def test_update_reuses_cells():
+    with tempfile.TemporaryDirectory() as directory:
+        store = GridStore.open(_build(directory).path, writable=True)
+        store.times[:] = -1     # marks the cells that are copied rather than calculated
+        store.times.flush()
+
+        wider = {'min': 100, 'max': 700, 'step': 100}
+        updated, calculated = GridStore.update(
+            store.path, initial_balance=BALANCES, interest_rate=RATES, monthly_payment=wider)
+        assert_equal(updated.times.shape, (11, 11, 7))
+        assert_equal(calculated, 11 * 11 * 2)
+        assert_equal(updated.get_payoff_time(5000, 0.07, 300), -1)
+        assert_almost_equal(
+            updated.get_payoff_time(5000, 0.07, 700),
+            payments_to_payoff(5000, 0.07 / 12, 700),
+            places=3)
+        assert_raises(ValueError, updated.index_of, 'p', 0)
+
+
+def test_update_new_balances_and_rates():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _build(directory)
+        balances = {'min': 5000, 'max': 15000, 'step': 1000}
+        rates = {'min': 0, 'max': 0.1, 'step': 0.005}
+        updated, calculated = GridStore.update(
+            store.path, initial_balance=balances, interest_rate=rates, monthly_payment=PAYMENTS)
+        assert_equal(calculated, 11 * 21 * 6 - 6 * 11 * 6)
+
+        expected = GridStore.build(
+            os.path.join(directory, 'expected.grid'),
+            initial_balance=balances, interest_rate=rates, monthly_payment=PAYMENTS)
+        assert_true(np.array_equal(updated.times, expected.times))
+
+
+def test_update_recalculates_other_formula_versions():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _build(directory)
+        assert_equal(store.formula_version, FORMULA_VERSION)
+        with open(store.path, 'r+b') as f:
+            f.seek(8)
+            f.write(struct.pack('<H', FORMULA_VERSION + 1))
+
+        updated, calculated = GridStore.update(
+            store.path, initial_balance=BALANCES, interest_rate=RATES, monthly_payment=PAYMENTS)
+        assert_equal(calculated, 11 * 11 * 6)
+        assert_equal(updated.formula_version, FORMULA_VERSION)
+        # Rebuilt beside the old store and moved into place
+        assert_equal(updated.path, store.path)
+        assert_false(os.path.exists(store.path + '.update'))
+
+
+def test_months_encoding():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _build(directory)
+        compact = GridStore.build(
+            os.path.join(directory, 'compact.grid'), initial_balance=BALANCES,
+            interest_rate=RATES, monthly_payment=PAYMENTS, encoding='months')
+        assert_equal(compact.encoding, 'months')
+        assert_equal(compact.data.nbytes * 2, store.data.nbytes)
+        assert_equal(compact.get_payoff_time(5000, 0.07, 300),
+                     round(store.get_payoff_time(5000, 0.07, 300)))
+        assert_equal([p for p, t in compact.get_time_vs_payment_data(10000, 0.1)],
+                     [100, 200, 300, 400, 500])
+        assert_true(check_accuracy(store.times, compact.data).max_error <= 0.5)
+
+
+def test_lazy_table_matches_decoded_table():
+    with tempfile.TemporaryDirectory() as directory:
+        store = GridStore.build(
+            os.path.join(directory, 'compact.grid'), initial_balance=BALANCES,
+            interest_rate=RATES, monthly_payment=PAYMENTS, encoding='months')
+        Bo, r, p = [2500, 7300], [0.015, 0.062], [250, 480]
+        np.testing.assert_array_equal(
+            interpolate_payoff_times(store.as_table(lazy=True), Bo, r, p),
+            interpolate_payoff_times(store.as_table(), Bo, r, p))
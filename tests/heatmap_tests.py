@@ -0,0 +1,67 @@
+import tkinter as tk
+
+from nose.tools import *
+import numpy as np
+
+import knowledge_tree.constants as constants
+from knowledge_tree.heatmap import payoff_plane, resample, colorize, to_ppm, NEVER_PAID_OFF_COLOR
+from knowledge_tree.view import View
+from tests.axes_tests import FakeCanvas
+
+
+class FakePhotoImage(object):
+    """Stands in for tk.PhotoImage, which needs a Tk root window"""
+    def __init__(self, **options):
+        pass
+
+    def configure(self, **options):
+        pass
+
+
+def test_payoff_plane():
+    plane = payoff_plane(100000)
+    assert_equal(plane.shape, (len(constants.interest_rate_axis()), len(constants.monthly_payment_axis())))
+    # The highest rate is in the first row and takes longest to pay off
+    assert_true(plane[0, -1] > plane[-1, -1])
+    assert_true(np.isinf(plane[0, 0]))
+
+
+def test_resample():
+    values = np.arange(6).reshape(2, 3)
+    assert_equal(resample(values, 6, 4).tolist()[0], [0, 0, 1, 1, 2, 2])
+    assert_equal(resample(values, 6, 4).shape, (4, 6))
+
+
+def test_colorize():
+    rgb = colorize(np.array([[0, 30, 45, np.inf]]), 30)
+    assert_equal(rgb.shape, (1, 4, 3))
+    assert_equal(rgb.dtype, np.uint8)
+    assert_equal(tuple(rgb[0, 0]), (68, 1, 84))
+    assert_equal(tuple(rgb[0, 1]), (253, 231, 37))
+    assert_equal(tuple(rgb[0, 2]), NEVER_PAID_OFF_COLOR)
+    assert_equal(tuple(rgb[0, 3]), NEVER_PAID_OFF_COLOR)
+
+
+def test_to_ppm():
+    data = to_ppm(np.zeros((2, 3, 3), dtype=np.uint8))
+    assert_true(data.startswith(b'P6 3 2 255\n'))
+    assert_equal(len(data), len(b'P6 3 2 255\n') + 18)
+
+
+def test_toggling_the_heatmap_does_not_leak_items():
+    canvas = FakeCanvas()
+    view = View(canvas=canvas)
+    photo_image, tk.PhotoImage = tk.PhotoImage, FakePhotoImage
+    try:
+        view.show_heatmap(50000)
+        shown = len(canvas.items)
+        view.hide_heatmap()
+        hidden = len(canvas.items)
+        for _ in range(3):
+            view.show_heatmap(50000)
+            view.hide_heatmap()
+    finally:
+        tk.PhotoImage = photo_image
+
+    assert_true(shown > hidden)
+    assert_equal(len(canvas.items), hidden)
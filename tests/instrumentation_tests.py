@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+
+from nose.tools import *
+
+from knowledge_tree import instrumentation
+from knowledge_tree.financial_tools import payments_to_payoff, payments_to_payoff_array
+from tests.axes_tests import FakeCanvas
+
+
+def setup_module():
+    instrumentation.reset()
+
+
+def teardown_module():
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_disabled_records_nothing():
+    instrumentation.disable()
+    instrumentation.reset()
+    instrumentation.count('calls')
+    with instrumentation.timer('work_seconds'):
+        pass
+    assert_equal(instrumentation.snapshot(), {'counters': {}, 'distributions': {}})
+
+
+def test_counters_and_distributions():
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        instrumentation.count('calls')
+        instrumentation.count('calls', 2)
+        for value in range(1, 101):
+            instrumentation.observe('items', value)
+        with instrumentation.timer('work_seconds'):
+            pass
+    finally:
+        instrumentation.disable()
+
+    data = instrumentation.snapshot()
+    assert_equal(data['counters'], {'calls': 3})
+    assert_equal(data['distributions']['items']['count'], 100)
+    assert_equal(data['distributions']['items']['max'], 100)
+    assert_almost_equal(data['distributions']['items']['p50'], 50.5)
+    assert_equal(data['distributions']['work_seconds']['count'], 1)
+    assert_equal(len(instrumentation.format_snapshot(data)), 3)
+
+
+def test_payoff_hooks_and_export():
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        payments_to_payoff(1000, 0.01, 5)
+        payments_to_payoff_array(1000, 0.01, [5, 20, 200])
+    finally:
+        instrumentation.disable()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'snapshot.json')
+        instrumentation.export(path)
+        with open(path) as f:
+            counters = json.load(f)['counters']
+    assert_equal(counters, {'payoff.calls': 1, 'payoff.cells': 4, 'payoff.log_domain_failures': 2})
+
+
+def test_overlay():
+    canvas = FakeCanvas()
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        instrumentation.count('calls')
+        overlay = instrumentation.Overlay(canvas)
+    finally:
+        instrumentation.disable()
+    assert_equal(canvas.items[overlay.item]['options']['text'], 'calls: 1')
+    assert_equal(len(canvas.idle_callbacks), 1)
+    overlay.stop()
+    assert_equal(canvas.idle_callbacks, [])
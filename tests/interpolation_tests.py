@@ -0,0 +1,56 @@
+from nose.tools import *
+import numpy as np
+
+from knowledge_tree.grid_axis import GridAxis
+from knowledge_tree.grid_store import compute_slab
+from knowledge_tree.payoff_table import PayoffTable
+from knowledge_tree.financial_tools import payments_to_payoff_array
+from knowledge_tree.interpolation import interpolate_payoff_times
+
+
+def _table():
+    axes = {
+        'Bo': GridAxis(0, 2000, 11),
+        'r': GridAxis(0, 0.01, 11),
+        'p': GridAxis(100, 100, 10)}
+    return PayoffTable(axes['Bo'], axes['r'], axes['p'], compute_slab(axes, 0, 11))
+
+
+def test_on_grid_points_are_exact():
+    table = _table()
+    times, bounds = interpolate_payoff_times(table, [4000, 6000], [0.05, 0.07], [300, 500])
+    assert_true(np.allclose(times, table.times[[2, 3], [5, 7], [2, 4]]))
+    assert_true(np.allclose(bounds, 0))
+
+
+def test_between_cells_within_bound():
+    table = _table()
+    rng = np.random.default_rng(1)
+    Bo = rng.uniform(0, 20000, 1000)
+    r = rng.uniform(0, 0.1, 1000)
+    p = rng.uniform(200, 1000, 1000)
+    exact = payments_to_payoff_array(Bo, r / 12, p)
+
+    times, bounds = interpolate_payoff_times(table, Bo, r, p)
+    assert_equal(times.shape, (1000,))
+    checked = np.isfinite(times) & np.isfinite(bounds)
+    assert_true(checked.sum() > 500)
+    assert_true(np.all(np.abs(times - exact)[checked] <= bounds[checked] + 1e-3))
+
+
+def test_log_space_near_boundary():
+    table = _table()
+    # Between a payment that covers the interest and one that does not
+    Bo, r, p = 20000, 0.1, 170
+    linear, _ = interpolate_payoff_times(table, Bo, r, p)
+    log_space, bound = interpolate_payoff_times(table, Bo, r, p, log_space=True)
+    assert_equal(linear, np.inf)
+    assert_true(np.isfinite(log_space))
+    assert_equal(bound, np.inf)
+    assert_true(log_space > payments_to_payoff_array(Bo, r / 12, 200))
+
+
+def test_outside_of_table():
+    times, bounds = interpolate_payoff_times(_table(), 30000, 0.05, 300)
+    assert_true(np.isnan(times))
+    assert_true(np.isnan(bounds))
@@ -0,0 +1,86 @@
+import os
+import tempfile
+
+from nose.tools import *
+import numpy as np
+
+from knowledge_tree.offscreen import OffscreenCanvas, encode_png, render_scenarios
+from knowledge_tree.view import View
+
+
+def test_items_and_stacking():
+    canvas = OffscreenCanvas(width=100, height=50)
+    line = canvas.create_line(0, 0, 10, 10, fill='red')
+    text = canvas.create_text(50, 25, text='hello', anchor='sw')
+    assert_equal(canvas.coords(line), [0, 0, 10, 10])
+    canvas.coords(line, 1, 2, 3, 4)
+    assert_equal(canvas.coords(line), [1, 2, 3, 4])
+    assert_equal(canvas.itemcget(line, 'fill'), 'red')
+    assert_equal(canvas.bbox(text), (50, 12, 80, 25))
+
+    canvas.tag_raise(line)
+    assert_equal(canvas.find_all(), (text, line))
+    canvas.delete(text)
+    assert_equal(canvas.find_all(), (line,))
+
+
+def test_idle_callbacks():
+    canvas = OffscreenCanvas()
+    calls = []
+    canvas.after_idle(calls.append, 1)
+    cancelled = canvas.after_idle(calls.append, 2)
+    canvas.after_cancel(cancelled)
+    canvas.after(0, calls.append, 3)
+    canvas.update()
+    assert_equal(calls, [3, 1])
+
+
+def test_rasterize():
+    canvas = OffscreenCanvas(width=20, height=10)
+    canvas.create_line(0, 5, 19, 5, fill='red')
+    canvas.create_rectangle(2, 1, 4, 3, fill='#0000FF', outline='')
+    hidden = canvas.create_line(0, 0, 19, 0)
+    canvas.itemconfigure(hidden, state='hidden')
+
+    image = canvas.rasterize()
+    assert_equal(image.shape, (10, 20, 3))
+    assert_equal(image[5, :].tolist(), [[255, 0, 0]] * 20)
+    assert_equal(image[2, 3].tolist(), [0, 0, 255])
+    assert_equal(image[0, 10].tolist(), [255, 255, 255])
+    assert_true(encode_png(image).startswith(b'\x89PNG\r\n\x1a\n'))
+
+
+def test_view_starts_without_a_curve():
+    canvas = OffscreenCanvas()
+    view = View(canvas=canvas, plot_curve=False)
+    canvas.update_idletasks()
+    empty = len(canvas.find_all())
+
+    view.apply_curve(View.compute_curve(50000, 0.05))
+    canvas.update_idletasks()
+    assert_true(len(canvas.find_all()) > empty)
+
+
+def test_view_draws_offscreen():
+    canvas = OffscreenCanvas()
+    view = View(canvas=canvas)
+    view.update_axes(50000, 0.05)
+    canvas.update_idletasks()
+    svg = canvas.to_svg()
+    assert_in('Monthly payment ($)', svg)
+    assert_true(svg.count('<ellipse') > 0 or svg.count('<polyline') > 2)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = render_scenarios([(50000, 0.05), (100000, 0.07)], directory, 'png')
+        assert_equal([os.path.basename(path) for path in paths],
+                     ['chart_50000_0.05.png', 'chart_100000_0.07.png'])
+        assert_true(all(os.path.getsize(path) > 0 for path in paths))
+
+
+def test_close_scenarios_get_their_own_files():
+    with tempfile.TemporaryDirectory() as directory:
+        paths = render_scenarios([(1234567, 0.05), (1234568, 0.05), (100000, 0.0675)], directory)
+        assert_equal([os.path.basename(path) for path in paths],
+                     ['chart_1234567_0.05.svg', 'chart_1234568_0.05.svg',
+                      'chart_100000_0.0675.svg'])
+        assert_equal(len(os.listdir(directory)), 3)
@@ -0,0 +1,32 @@
+from nose.tools import *
+import numpy as np
+
+from knowledge_tree.payoff_table import PayoffTable
+from knowledge_tree.grid_axis import GridAxis
+
+
+def _table():
+    rows = [[(0.0, 0.01, 100.0, 0.0), (1000.0, 0.01, 100.0, 10.5)],
+            [(1000.0, 0.02, 200.0, 5.25)]]
+    return PayoffTable.from_rows(rows, GridAxis(0, 1000, 2), GridAxis(0, 0.01, 3), GridAxis(100, 100, 2))
+
+
+def test_get():
+    table = _table()
+    assert_equal(table.get(1000, 0.01, 100), 10.5)
+    assert_equal(table.get(1000, 0.01 + 1e-12, 100), 10.5)
+    assert_raises(ValueError, table.get, 1000, 0.01, 200)
+    assert_raises(ValueError, table.get, 1000, 0.015, 100)
+
+
+def test_curve_and_slice():
+    table = _table()
+    payments, times = table.curve(1000, 0.02)
+    assert_equal(payments.tolist(), [100, 200])
+    assert_equal(times.tolist(), [np.inf, 5.25])
+    assert_equal(table.rate_slice(0.01).shape, (2, 2))
+
+
+def test_nbytes():
+    table = _table()
+    assert_equal(table.nbytes, 12 * 4)
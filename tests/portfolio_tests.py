@@ -0,0 +1,75 @@
+import io
+import json
+
+from nose.tools import *
+import numpy as np
+
+from knowledge_tree.financial_tools import payments_to_payoff
+from knowledge_tree.portfolio import evaluate_loans, evaluate_portfolio, read_blocks
+
+
+CSV = b"""id,payment,balance,apr
+1,200,10000,0.05
+
+2,10,10000,0.05
+3,100,0,0.05
+4,250,12000,0
+"""
+
+
+def evaluate(data, **kwargs):
+    output = io.BytesIO()
+    rows = evaluate_portfolio(io.BytesIO(data), output, workers=1, **kwargs)
+    return rows, output.getvalue().decode().splitlines()
+
+
+def test_evaluate_loans():
+    periods, total_interest, never = evaluate_loans([10000, 10000, 0], 0.05, [200, 10, 100])
+    assert_almost_equal(periods[0], payments_to_payoff(10000.0, 0.05 / 12, 200.0))
+    assert_almost_equal(total_interest[0], 200 * periods[0] - 10000)
+    assert_equal(never.tolist(), [False, True, False])
+    assert_equal(total_interest[2], 0)
+
+
+def test_csv():
+    rows, lines = evaluate(CSV, block_size=32)
+    periods = payments_to_payoff(10000.0, 0.05 / 12, 200.0)
+
+    assert_equal(rows, 4)
+    assert_equal(lines, [
+        'id,payment,balance,apr,payoff_periods,total_interest,never_pays_off',
+        '1,200,10000,0.05,{0},{1:.2f},0'.format(int(np.ceil(periods)), 200 * periods - 10000),
+        '2,10,10000,0.05,,,1',
+        '3,100,0,0.05,0,0.00,0',
+        '4,250,12000,0,48,0.00,0'])
+
+
+def test_csv_without_header():
+    rows, lines = evaluate(b'12000,0,250\n12000,0,1000', header=False)
+    assert_equal(rows, 2)
+    assert_equal(lines, ['12000,0,250,48,0.00,0', '12000,0,1000,12,0.00,0'])
+
+
+def test_ndjson():
+    data = b'{"balance": 12000, "apr": 0, "payment": 250, "id": "a"}\n\n' \
+           b'{"balance": 10000, "apr": 0.05, "payment": 10}\n'
+    rows, lines = evaluate(data, input_format='ndjson')
+
+    assert_equal(rows, 2)
+    records = [json.loads(line) for line in lines]
+    assert_equal(records[0], {'balance': 12000, 'apr': 0, 'payment': 250, 'id': 'a',
+                              'payoff_periods': 48, 'total_interest': 0.0,
+                              'never_pays_off': False})
+    assert_equal(records[1]['payoff_periods'], None)
+    assert_true(records[1]['never_pays_off'])
+
+
+def test_invalid_input():
+    assert_raises(ValueError, evaluate, b'balance,apr\n1,2\n')
+    assert_raises(ValueError, evaluate, b'balance,apr,payment\n1,2,3\n1,x,3\n')
+    assert_raises(ValueError, evaluate, b'{"balance": 1}\n', input_format='ndjson')
+
+
+def test_read_blocks():
+    blocks = list(read_blocks(io.BytesIO(b'a\nbb\nccc\nd'), block_size=3))
+    assert_equal(blocks, [(1, b'a\n'), (2, b'bb\n'), (3, b'ccc\n'), (4, b'd\n')])
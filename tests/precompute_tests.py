@@ -0,0 +1,74 @@
+import os
+import tempfile
+
+from nose.tools import *
+import numpy as np
+
+import knowledge_tree.constants as constants
+from knowledge_tree.benchmark import scaled_ranges
+from knowledge_tree.grid_axis import GridAxis
+from knowledge_tree.grid_store import GridStore, compute_slab
+from knowledge_tree.precompute import precompute, checkpoint_path, main
+from knowledge_tree.quantization import encode_months
+
+
+AXES = {
+    'Bo': GridAxis(0, 1000, 10),
+    'r': GridAxis(0, 0.01, 11),
+    'p': GridAxis(0, 100, 6)}
+
+
+def test_precompute_matches_build():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'test.grid')
+        assert_equal(precompute(path, axes=AXES, workers=2, shard_size=3), 4)
+        assert_false(os.path.exists(checkpoint_path(path)))
+
+        store = GridStore.open(path)
+        np.testing.assert_array_equal(store.times, compute_slab(AXES, 0, 10))
+
+
+def test_precompute_resumes_from_checkpoint():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'test.grid')
+        store = GridStore.create(path, AXES)
+        store.times[0:3] = compute_slab(AXES, 0, 3)
+        store.times.flush()
+        with open(checkpoint_path(path), 'w') as f:
+            f.write('0,3\n')
+
+        assert_equal(precompute(path, axes=AXES, workers=1, shard_size=3), 3)
+        np.testing.assert_array_equal(GridStore.open(path).times, compute_slab(AXES, 0, 10))
+
+
+def test_precompute_resumes_with_a_different_shard_size():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'test.grid')
+        store = GridStore.create(path, AXES)
+        store.times[0:1] = compute_slab(AXES, 0, 1)
+        store.times.flush()
+        with open(checkpoint_path(path), 'w') as f:
+            f.write('0,1\n')
+
+        # (0, 3) is only partly written, so it is calculated again
+        assert_equal(precompute(path, axes=AXES, workers=1, shard_size=3), 4)
+        np.testing.assert_array_equal(GridStore.open(path).times, compute_slab(AXES, 0, 10))
+
+
+def test_update_keeps_the_encoding_of_the_store():
+    with tempfile.TemporaryDirectory() as directory, scaled_ranges():
+        path = os.path.join(directory, 'test.grid')
+        store = GridStore.open(GridStore.build(path, encoding='months').path, writable=True)
+        store.data[:] = 7       # marks the cells that are copied rather than calculated
+        store.data.flush()
+        del store
+
+        constants.monthly_payment['max'] += 2 * constants.monthly_payment['step']
+        main([path, '--update'])
+
+        updated = GridStore.open(path)
+        assert_equal(updated.encoding, 'months')
+        assert_true((updated.data[:, :, :-2] == 7).all())
+        np.testing.assert_array_equal(
+            updated.data[:, :, -2:],
+            encode_months(compute_slab(updated.axes, 0, len(updated.axes['Bo'])))[:, :, -2:])
@@ -0,0 +1,25 @@
+from nose.tools import *
+import numpy as np
+
+from knowledge_tree.quantization import (
+    MAX_MONTHS, NEVER_PAID_OFF, check_accuracy, decode_months, encode_months)
+
+
+def test_round_trip():
+    times = np.array([0, 10.4, 10.6, np.inf, np.nan, 1e9], dtype=np.float32)
+    codes = encode_months(times)
+    assert_equal(codes.dtype, np.uint16)
+    assert_equal(codes.tolist(), [0, 10, 11, NEVER_PAID_OFF, NEVER_PAID_OFF, MAX_MONTHS])
+    assert_equal(decode_months(codes).tolist(), [0, 10, 11, np.inf, np.inf, MAX_MONTHS])
+
+
+def test_check_accuracy():
+    report = check_accuracy([1.25, 2.5, np.inf, 70000])
+    assert_equal(report.cells, 4)
+    assert_equal(report.saturated, 1)
+    assert_equal(report.mismatched, 0)
+
+    report = check_accuracy([1.25, 2.5, np.inf], codes=[1, 2, 3])
+    assert_equal(report.max_error, 0.5)
+    assert_equal(report.mean_error, 0.375)
+    assert_equal(report.mismatched, 1)
@@ -0,0 +1,52 @@
+from nose.tools import *
+
+from knowledge_tree.scheduler import FrameScheduler
+
+
+class FakeRoot(object):
+    """Stands in for tk.Tk, running scheduled callbacks only when asked"""
+    def __init__(self):
+        self.callbacks = {}
+        self.next_id = 0
+
+    def after(self, delay_ms, callback):
+        self.next_id += 1
+        self.callbacks[self.next_id] = callback
+        return self.next_id
+
+    def after_idle(self, callback):
+        return self.after(0, callback)
+
+    def after_cancel(self, after_id):
+        del self.callbacks[after_id]
+
+    def run(self):
+        callbacks, self.callbacks = self.callbacks, {}
+        for callback in callbacks.values():
+            callback()
+
+
+def test_requests_are_coalesced():
+    root = FakeRoot()
+    rendered = []
+    scheduler = FrameScheduler(root, lambda *args: rendered.append(args))
+
+    for balance in range(10):
+        scheduler.request(balance, 0.05)
+    root.run()
+
+    assert_equal(rendered, [(9, 0.05)])
+    assert_equal((scheduler.requests, scheduler.renders, scheduler.dropped), (10, 1, 9))
+
+
+def test_cancel():
+    root = FakeRoot()
+    rendered = []
+    scheduler = FrameScheduler(root, lambda *args: rendered.append(args))
+
+    scheduler.request(1, 0.05)
+    scheduler.cancel()
+    root.run()
+
+    assert_equal(rendered, [])
+    assert_equal(scheduler.dropped, 1)
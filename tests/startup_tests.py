@@ -0,0 +1,26 @@
+from nose.tools import *
+
+from knowledge_tree.startup import StartupTrace
+
+
+def test_phases_add_up():
+    trace = StartupTrace()
+    trace.mark('imports')
+    trace.mark('view')
+    trace.mark('curve')
+
+    assert_equal([name for name, _ in trace.phases], ['imports', 'view', 'curve'])
+    assert_true(all(seconds >= 0 for _, seconds in trace.phases))
+    assert_almost_equal(trace.elapsed('view'), trace.phases[0][1] + trace.phases[1][1])
+    assert_almost_equal(trace.elapsed(), sum(seconds for _, seconds in trace.phases))
+    assert_raises(KeyError, trace.elapsed, 'controller')
+
+
+def test_start_is_counted_in_the_first_phase():
+    trace = StartupTrace(start=0.0)
+    trace.mark('imports')
+    assert_true(trace.phases[0][1] > 0)
+
+    lines = trace.format()
+    assert_equal(len(lines), 1)
+    assert_true(lines[0].startswith('imports'))